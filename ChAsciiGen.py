@@ -32,6 +32,17 @@ Repository : GitHub.Com/Ch4120N/ChAsciiGen
 
 import sys
 import random
+import itertools
+from typing import Iterator
+
+# A daemon started with "--daemon start" already has the fonts loaded. The client
+# only needs the standard library, so hand the command to it before paying for
+# the imports below; it returns None when there is no daemon or it declines.
+if __name__ == '__main__':
+    from cli.client import forward
+    _status = forward(sys.argv[1:])
+    if _status is not None:
+        sys.exit(_status)
 
 try:
     import pyfiglet
@@ -48,31 +59,127 @@ except ImportError:
     )
 
 # Internal imports
-from ui.banner import MainBanner
+# Only what every action needs is imported up front. The interactive shell and
+# the renderer are imported and built the first time an action asks for them.
 from ui.decorators import MsgDCR
 from cli.parser import Parser
-from cli.interactive import Interactive
-from core.ascii_art import Figlet
-from core.config import Config
+from core.config import Config, RENDER_ENGINES, SCRIPT_NAME
+from core.exception import ChAsciiGenFontError
+from core.profiler import PROFILER
 from core.io import IO
 
 
 class ChAsciiGen:
     def __init__(self):
         self.parser = Parser()
-        self.interactive = Interactive()
-        self.figlet = Figlet()
-        self._temp_str = ''
+        self._interactive = None
+        self._figlet = None
 
-    def run(self):
+    @property
+    def interactive(self):
+        if self._interactive is None:
+            from cli.interactive import Interactive
+            self._interactive = Interactive()
+        return self._interactive
+
+    @property
+    def figlet(self):
+        if self._figlet is None:
+            from core.ascii_art import Figlet
+            Figlet.resize_cache(Config.FONT_CACHE_SIZE)
+            self._figlet = Figlet()
+        return self._figlet
+
+    def load_config(self) -> None:
         config = IO.load_config()
         Config.MAX_WIDTH = config.get('max_width', Config.MAX_WIDTH)
         Config.OUTPUT_FILE = config.get('output_file', Config.OUTPUT_FILE)
         Config.DEFAULT_FONT = config.get('default_font', Config.DEFAULT_FONT)
         Config.CONFIG_FILE = config.get('config_file', Config.CONFIG_FILE)
+        Config.FONT_CACHE_SIZE = config.get('font_cache_size', Config.FONT_CACHE_SIZE)
+        Config.CACHE_DIR = config.get('cache_dir', Config.CACHE_DIR)
+        Config.COMPILED_FONT_CACHE = config.get('compiled_font_cache', Config.COMPILED_FONT_CACHE)
+        Config.RENDER_ENGINE = config.get('render_engine', Config.RENDER_ENGINE)
+        if Config.RENDER_ENGINE not in RENDER_ENGINES:
+            # e.g. the numpy engine, which was removed
+            Config.RENDER_ENGINE = 'pyfiglet'
+        Config.PREFIX_CACHE_MAX_MB = config.get('prefix_cache_max_mb', Config.PREFIX_CACHE_MAX_MB)
+        Config.SERVER_HOST = config.get('server_host', Config.SERVER_HOST)
+        Config.SERVER_PORT = config.get('server_port', Config.SERVER_PORT)
+        Config.SERVER_WORKERS = config.get('server_workers', Config.SERVER_WORKERS)
+        Config.METRICS_DIR = config.get('metrics_dir', Config.METRICS_DIR)
+        Config.RENDER_CACHE = config.get('render_cache', Config.RENDER_CACHE)
+        Config.RENDER_CACHE_MAX_MB = config.get('render_cache_max_mb', Config.RENDER_CACHE_MAX_MB)
+        Config.DAEMON_IDLE_TIMEOUT = config.get('daemon_idle_timeout', Config.DAEMON_IDLE_TIMEOUT)
+        Config.ASYNC_CONCURRENCY = config.get('async_concurrency', Config.ASYNC_CONCURRENCY)
 
+    def run(self):
         """Main method: handles command-line arguments and executes corresponding actions."""
-        args = self.parser.build_parser()
+        self.load_config()
+
+        # The sub-commands are options, so any word (even "serve") is still rendered as text
+
+        # --- HTTP render service ---
+        if sys.argv[1:2] == ['--serve']:
+            return self.serve(self.parser.build_serve_parser(sys.argv[2:]))
+
+        # --- Combine the outputs of sharded --all-fonts runs ---
+        if sys.argv[1:2] == ['--merge']:
+            return self.merge(self.parser.build_merge_parser(sys.argv[2:]))
+
+        # --- Warm background process for later invocations ---
+        if sys.argv[1:2] == ['--daemon']:
+            return self.daemon(self.parser.build_daemon_parser(sys.argv[2:]))
+
+        return self.execute(self.parser.build_parser())
+
+    def execute(self, args) -> int:
+        """Run the parsed command line, exporting metrics afterwards when asked to."""
+        metrics_dir = getattr(args, 'metrics_dir', None)
+        if metrics_dir:
+            Config.METRICS_DIR = metrics_dir
+
+        try:
+            if getattr(args, 'profile', False):
+                return self.profile(args)
+            return self.dispatch(args)
+        finally:
+            # --- Leave the metrics for a local scraper ---
+            if Config.METRICS_DIR:
+                IO.export_metrics()
+
+    @staticmethod
+    def forwardable(args) -> bool:
+        """True for the actions a running daemon serves: rendering one text, searching and listing fonts."""
+        if any(getattr(args, name, False) for name in (
+                'serve', 'merge', 'daemon', 'stdin', 'all_fonts', 'interactive', 'profile',
+                'rebuild_font_cache', 'clear_cache')):
+            return False
+        if getattr(args, 'list_all_fonts', False) or getattr(args, 'search_font', None) is not None:
+            return True
+        text = getattr(args, 'text', None)
+        return bool(text) and text != '-'
+
+    def profile(self, args) -> int:
+        """Run the selected action while timing every stage ("--profile")."""
+        PROFILER.enable()
+        try:
+            return self.dispatch(args)
+        finally:
+            PROFILER.report()
+            profile_dump = getattr(args, 'profile_dump', None)
+            if profile_dump:
+                for path in PROFILER.dump(profile_dump):
+                    print(f'{MsgDCR.INFO}Profile written to: {path}', file=sys.stderr)
+            PROFILER.disable()
+
+    def dispatch(self, args) -> int:
+        """Run the action selected on the command line."""
+        # --- Sub-commands are only recognised in front of their own options ---
+        for name in ('serve', 'merge', 'daemon'):
+            if getattr(args, name, False):
+                MsgDCR.FailureMessage(f'--{name} must be the first argument, e.g. "{SCRIPT_NAME} --{name} --help".')
+                return 1
 
         # --- List all available fonts ---
         if getattr(args, 'list_all_fonts', False):
@@ -84,11 +191,46 @@ class ChAsciiGen:
             self.figlet.showfonts(margin_left=0)
             return 0
 
+        engine = getattr(args, 'engine', None)
+        if engine:
+            Config.RENDER_ENGINE = engine
+
+        if getattr(args, 'cache', False):
+            Config.RENDER_CACHE = True
+        if getattr(args, 'no_cache', False):
+            Config.RENDER_CACHE = False
+
+        # --- Empty the on-disk render cache ---
+        if getattr(args, 'clear_cache', False):
+            from core.render_cache import RenderCache
+
+            if not RenderCache.shared().clear():
+                MsgDCR.FailureMessage('Failed to clear the render cache.')
+                return 1
+            MsgDCR.SuccessMessage('Render cache cleared.')
+            return 0
+
+        # --- Rebuild the compiled font cache ---
+        if getattr(args, 'rebuild_font_cache', False):
+            MsgDCR.InfoMessage('Rebuilding compiled font cache...')
+            stats = self.figlet.rebuild_font_cache()
+            if not stats['fonts']:
+                MsgDCR.FailureMessage('No fonts could be compiled.')
+                return 1
+            parse_ms = stats['parse_time'] * 1000 / stats['fonts']
+            load_ms = stats['load_time'] * 1000 / stats['fonts']
+            MsgDCR.SuccessMessage(f"Compiled {stats['fonts']} fonts.")
+            MsgDCR.GeneralMessage(f"Parse .flf   : {parse_ms:.2f} ms per font")
+            MsgDCR.GeneralMessage(f"Load cached  : {load_ms:.2f} ms per font")
+            MsgDCR.GeneralMessage(f"Saved        : {parse_ms - load_ms:.2f} ms per cold start")
+            return 0
+
         # --- Search for a specific font ---
         search_font = getattr(args, 'search_font', None)
-        if search_font:
+        if search_font is not None:
+            filters = {name: getattr(args, name) for name in ('max_height', 'min_height', 'max_width', 'covers')}
             # Fixed typo: 'serach_font' -> 'search_font'
-            self.figlet.search_font(search_font, 0, True)
+            self.figlet.search_font(search_font, 0, True, **filters)
             return 0
 
         # --- Handle conflicting options ---
@@ -98,6 +240,11 @@ class ChAsciiGen:
             MsgDCR.FailureMessage('You cannot use both --font and --random options together.')
             return 1
 
+        fit_width = getattr(args, 'fit', None)
+        if fit_width is not None and (font_opt or random_opt or getattr(args, 'all_fonts', False)):
+            MsgDCR.FailureMessage('The --fit option cannot be combined with --font, --random or --all-fonts.')
+            return 1
+
         # --- Handle output file option ---
         output_file = getattr(args, 'output', None)
         if output_file:
@@ -109,6 +256,24 @@ class ChAsciiGen:
         all_fonts = getattr(args, 'all_fonts', False)
         interactive_mode = getattr(args, 'interactive', False)
 
+        # --- Stream stdin lines through the renderer ("--stdin" or "-") ---
+        if getattr(args, 'stdin', False) or text == '-':
+            if all_fonts:
+                MsgDCR.FailureMessage('You cannot use --all-fonts while reading text from stdin.')
+                return 1
+            font = random.choice(self.figlet._fonts) if random_opt else font_opt or Config.DEFAULT_FONT
+            try:
+                font = ','.join(self.figlet.resolve_fonts(font))
+            except ChAsciiGenFontError as e:
+                MsgDCR.FailureMessage(str(e))
+                return 1
+
+            blocks = self.stdin_blocks(font, width)
+            if output_file:
+                return 0 if IO.stream_file(blocks) else 1
+            IO.stream_stdout(blocks)
+            return 0
+
         # --- Start interactive mode if no text provided ---
         if not text and not interactive_mode:
             MsgDCR.WarningMessage('No text provided. Starting interactive mode...')
@@ -121,29 +286,51 @@ class ChAsciiGen:
                 MsgDCR.WarningMessage('You need to use --output with --all-fonts option.')
                 return 1
 
-            outputs = []
-            for f in self.figlet._fonts:
-                art = self.figlet.text2ascii(text, font=f, width=width)
-                outputs.append(f"--- FONT: {f} ---\n{art}\n\n")
+            jobs = getattr(args, 'jobs', 1)
+            resume = getattr(args, 'resume', False)
+            shard = getattr(args, 'shard', None)
+            if shard:
+                if getattr(args, 'incremental', False):
+                    MsgDCR.FailureMessage('You cannot use both --incremental and --shard options together.')
+                    return 1
+                return self.shard(text, width, jobs, output_file, shard, resume)
 
-            IO.save_writelines_file(outputs)
-            return 0
+            if getattr(args, 'incremental', False):
+                if resume:
+                    MsgDCR.FailureMessage('You cannot use both --incremental and --resume options together.')
+                    return 1
+                return self.gallery(text, width, jobs, output_file)
+
+            # Finished fonts are journaled next to the output so an interrupted run can --resume
+            from core.checkpoint import CheckpointedRun
+            return 0 if CheckpointedRun(self.figlet, output_file).run(text, width=width, jobs=jobs, resume=resume) else 1
 
         # --- Determine which font to use ---
-        if random_opt:
+        if fit_width is not None:
+            fitted = self.figlet.fit(text, fit_width)
+            if fitted is None:
+                MsgDCR.FailureMessage(f'No font draws the text in {fit_width} columns.')
+                return 1
+            font, fitted_rows = fitted
+            header = [f'--- FONT: {font} ---\n\n']
+        elif random_opt:
             font = random.choice(self.figlet._fonts)
-            ascii_art = f'--- FONT: {font} ---\n\n' + self.figlet.text2ascii(text, font=font, width=width)
+            header = [f'--- FONT: {font} ---\n\n']
         else:
             font = font_opt or Config.DEFAULT_FONT
-            ascii_art = self.figlet.text2ascii(text, font=font, width=width)
+            header = []
 
-        self._temp_str = ascii_art
+        # Rows are rendered lazily, one input line at a time, and written as they come
+        if fit_width is not None:
+            rows = (row + '\n' for row in fitted_rows)
+        else:
+            rows = (row + '\n' for row in self.figlet.iter_lines(text, font=font, width=width))
 
         # --- Save or print the result ---
         if output_file:
-            IO.save_file(self._temp_str)
+            IO.save_file(itertools.chain(header, rows))
         else:
-            print(self._temp_str)
+            IO.stream_stdout(itertools.chain(header, rows, ['\n']))
             return 0
 
         # --- Fallback to interactive mode if requested ---
@@ -151,6 +338,87 @@ class ChAsciiGen:
             self.interactive.run()
             return 0
 
+    def gallery(self, text: str, width: int, jobs: int, path: str) -> int:
+        """Update the all-fonts output at `path` in place ("--all-fonts --incremental")."""
+        from core.gallery import FontGallery
+
+        stats = FontGallery(self.figlet, path).build(text, width=width, jobs=jobs)
+        return 0 if stats is not None else 1
+
+    def daemon(self, args) -> int:
+        from cli import client
+
+        path = args.socket or client.socket_path()
+        if args.command == 'run':
+            from core.daemon import RenderDaemon
+            return RenderDaemon(self, path, args.idle_timeout).run()
+
+        reply = client.request({'op': 'ping'}, path)
+        if args.command == 'status':
+            if reply is None:
+                MsgDCR.InfoMessage(f'No daemon is listening on {path}.')
+                return 1
+            MsgDCR.SuccessMessage(f"Daemon {reply['pid']} is listening on {path}.")
+            MsgDCR.GeneralMessage(f"Uptime       : {reply['uptime']:.0f} s")
+            MsgDCR.GeneralMessage(f"Idle timeout : {reply['idle_timeout'] or 'never'}")
+            MsgDCR.GeneralMessage(
+                f"Requests     : {reply['requests']} ({reply['served']} served, {reply['declined']} run in-process)"
+            )
+            return 0
+
+        if args.command == 'stop':
+            if reply is None or client.request({'op': 'stop'}, path) is None:
+                MsgDCR.InfoMessage(f'No daemon is listening on {path}.')
+                return 1
+            MsgDCR.SuccessMessage(f"Daemon {reply['pid']} stopped.")
+            return 0
+
+        # --- start ---
+        if reply is not None:
+            MsgDCR.WarningMessage(f"Daemon {reply['pid']} is already listening on {path}.")
+            return 0
+        from core.daemon import RenderDaemon
+
+        pid = RenderDaemon.spawn(path, args.idle_timeout)
+        if pid is None:
+            MsgDCR.FailureMessage(f'The daemon did not come up, run "{SCRIPT_NAME} --daemon run" to see why.')
+            return 1
+        MsgDCR.SuccessMessage(f'Daemon {pid} listening on {path}.')
+        return 0
+
+    def shard(self, text: str, width: int, jobs: int, path: str, spec: str, resume: bool) -> int:
+        """Render one cost-balanced part of the fonts to `path` ("--all-fonts --shard i/N")."""
+        from core.shard import FontShards
+
+        try:
+            number, count = FontShards.parse(spec)
+        except ValueError as e:
+            MsgDCR.FailureMessage(str(e))
+            return 1
+        return 0 if FontShards(self.figlet, number, count).run(text, path, width=width, jobs=jobs, resume=resume) else 1
+
+    def merge(self, args) -> int:
+        from core.shard import FontShards
+
+        return 0 if FontShards.merge(args.shards, args.output) else 1
+
+    def serve(self, args) -> int:
+        from core.server import RenderServer
+
+        if args.engine:
+            Config.RENDER_ENGINE = args.engine
+        return RenderServer(args.host, args.port, args.workers).run()
+
+    def stdin_blocks(self, font: str, width: int) -> Iterator[str]:
+        """Lazily render each stdin line with one loaded font; failed lines are reported on stderr."""
+        lines = (line.rstrip('\r\n') for line in sys.stdin)
+        results = self.figlet.render_many(lines, font=font, width=width)
+        for number, result in enumerate(results, 1):
+            if result.error:
+                print(f'{MsgDCR.FAIL}line {number}: {result.error}', file=sys.stderr)
+                continue
+            yield result.art + '\n'
+
 
 if __name__ == '__main__':
     app = ChAsciiGen()
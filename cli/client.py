@@ -0,0 +1,130 @@
+# -*- coding: UTF-8 -*-
+# cli/client.py
+
+# Only the standard library is imported here: the client runs before pyfiglet
+# and colorama are loaded, which is the start-up cost the daemon saves.
+import os
+import sys
+import json
+import socket
+import tempfile
+from typing import List, Optional
+
+SOCKET_ENV = 'CHASCIIGEN_SOCKET'
+NO_DAEMON_ENV = 'CHASCIIGEN_NO_DAEMON'
+CONNECT_TIMEOUT = 1.0
+
+
+def socket_path() -> str:
+    """Return the per-user daemon socket ($CHASCIIGEN_SOCKET, else in $XDG_RUNTIME_DIR or the temp dir)."""
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'chasciigen.sock')
+    uid = os.getuid() if hasattr(os, 'getuid') else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f'chasciigen-{uid}.sock')
+
+
+def is_own_socket(path: str) -> bool:
+    """True if `path` is a socket that belongs to the current user, so another user cannot pose as the daemon."""
+    import stat
+
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and (not hasattr(os, 'getuid') or st.st_uid == os.getuid())
+
+
+def connect(path: str = '', timeout: float = CONNECT_TIMEOUT) -> Optional[socket.socket]:
+    """Connect to a running daemon, or return None when there is none."""
+    path = path or socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not is_own_socket(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: dict, path: str = '', timeout: Optional[float] = CONNECT_TIMEOUT) -> Optional[dict]:
+    """Send one control message ('ping', 'stop') and return the daemon's reply, or None."""
+    sock = connect(path)
+    if sock is None:
+        return None
+    try:
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with sock.makefile('r', encoding='utf-8') as replies:
+            return json.loads(replies.readline() or 'null')
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """
+    Run a command line on the daemon and return its exit status.
+
+    Returns None, so the caller renders in-process, when no daemon is
+    running, when $CHASCIIGEN_NO_DAEMON is set or when the daemon declines
+    the command (interactive mode, stdin input, --all-fonts and the like).
+    Output arrives as newline-delimited JSON messages, {"out": ...} and
+    {"err": ...} chunks followed by {"exit": status}, and is written as it
+    comes.
+    """
+    if os.environ.get(NO_DAEMON_ENV) or argv[:1] in (['--daemon'], ['--serve'], ['--merge']):
+        return None
+    sock = connect()
+    if sock is None:
+        return None
+
+    try:
+        columns = os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError, AttributeError):
+        columns = 0
+    message = {
+        'op': 'run',
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'tty': [sys.stdout.isatty(), sys.stderr.isatty()],
+        'columns': columns,
+    }
+    started = False
+    try:
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        # Renders can take a while, only the connection itself is on a short timeout
+        sock.settimeout(None)
+        with sock.makefile('r', encoding='utf-8') as replies:
+            for line in replies:
+                reply = json.loads(line)
+                if reply.get('fallback'):
+                    return None
+                if 'exit' in reply:
+                    return reply['exit']
+                started = True
+                stream = sys.stderr if 'err' in reply else sys.stdout
+                stream.write(reply.get('err', reply.get('out', '')))
+                stream.flush()
+    except BrokenPipeError:
+        # Our reader went away (e.g. `| head`), end quietly like IO.stream_stdout does
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError):
+        pass
+    finally:
+        sock.close()
+
+    if not started:
+        return None
+    # Part of the output is already written, running the command again would repeat it
+    sys.stderr.write('[ - ] Lost the connection to the ChAsciiGen daemon.\n')
+    return 1
@@ -10,6 +10,7 @@ import json
 import shlex
 import platform
 import argparse
+import itertools
 import random 
 
 from colorama import Fore, init
@@ -19,11 +20,15 @@ from core.ascii_art import Figlet
 from core.config import (
     PROMPT, 
     COMMAND_NOT_FOUND, 
+    RENDER_ENGINES,
     Config, 
     DEFAULT_CONFIG
 )
 from core.exception import ChAsciiGenParserExit
 from core.io import IO
+from core.metrics import METRICS
+from core.profiler import PROFILER
+from core.render_cache import RenderCache
 from ui.banner import MainBanner, MainSubBanner
 from ui.decorators import MsgDCR
 from ui.colorize import colorize
@@ -258,15 +263,32 @@ class Interactive(cmd.Cmd):
         List all available fonts, with optional keyword filtering.
 
         SYNOPSIS:
-            fonts [--search <keyword>]
+            fonts [--search <keyword>] [--max-height <rows>] [--min-height <rows>]
+                  [--max-glyph-width <columns>] [--covers <characters>]
 
         OPTIONS:
             -s, --search <keyword>
                 Filter fonts by keyword.
 
+            --max-height <rows>
+                Only fonts that are at most this many rows tall.
+
+            --min-height <rows>
+                Only fonts that are at least this many rows tall.
+
+            --max-glyph-width <columns>
+                Only fonts whose widest glyph fits in this many columns.
+
+            --covers <characters>
+                Only fonts with a visible glyph for every given character.
+                Ranges are written as a-b, e.g. "0-9:" or "A-Za-z".
+
         DESCRIPTION:
             Lists all fonts available in the pyfiglet library.
             You can use the --search flag to narrow down the list.
+            The height, width and coverage filters are answered from the font
+            metadata index, which is built once on first use and kept in the
+            cache directory, so no font is loaded or rendered for a query.
 
         EXAMPLES:
             fonts
@@ -274,6 +296,9 @@ class Interactive(cmd.Cmd):
 
             fonts --search block
                 Lists fonts with "block" in their name
+
+            fonts --max-height 6 --covers "0-9:"
+                Lists fonts at most 6 rows tall that can draw a clock
         """
         parser = argparse.ArgumentParser(
                     prog="fonts",
@@ -282,6 +307,10 @@ class Interactive(cmd.Cmd):
                     add_help=False
                 )
         parser.add_argument('-s', '--search', type=str, help='Keyword to filter fonts', dest='search')
+        parser.add_argument('--max-height', type=int, default=0, dest='max_height')
+        parser.add_argument('--min-height', type=int, default=0, dest='min_height')
+        parser.add_argument('--max-glyph-width', type=int, default=0, dest='max_width')
+        parser.add_argument('--covers', type=str, default='', dest='covers')
         parser.add_argument('-h', '--help', action='store_true', help='Show help message')
 
         parser.error = lambda message: (
@@ -299,8 +328,14 @@ class Interactive(cmd.Cmd):
             self.do_help('fonts')
             return
         
-        if args.search:
-            self._figlet.search_font(args.search)
+        filters = {
+            'max_height': args.max_height,
+            'min_height': args.min_height,
+            'max_width': args.max_width,
+            'covers': args.covers,
+        }
+        if args.search or any(filters.values()):
+            self._figlet.search_font(args.search or '', **filters)
             return
 
         self._figlet.showfonts()
@@ -315,8 +350,10 @@ class Interactive(cmd.Cmd):
         OPTIONS:
             -f, --font <font name>
                 Use a specific font for rendering. You can list available fonts
-                using the `fonts` command.
+                using the `fonts` command. A comma separated list is a fallback
+                chain: every character is drawn with the first font that has it.
                 Example: -f slant
+                Example: -f slant,standard,term
             
             -w, --width <ascii width>
                 Use a specific width for output ASCII art
@@ -325,6 +362,12 @@ class Interactive(cmd.Cmd):
             -r, --random
                 Use a random font for rendering the ASCII art.
 
+            --fit <columns>
+                Use the biggest font that draws the text in this many columns
+                without wrapping. Fonts are ranked on precomputed glyph widths
+                and only the chosen font is rendered.
+                Example: --fit 60
+
             -h, --help
                 Show this help message for the `show` command.
 
@@ -346,6 +389,9 @@ class Interactive(cmd.Cmd):
             
             show -f slant -w 100 "Hello World"
                 Display ASCII art for "Hello World" using the slant font and change output width 100
+
+            show --fit 60 "Hello World"
+                Display "Hello World" in the biggest font that fits in 60 columns
             
             show -h
                 Show detailed usage information for this command.
@@ -360,6 +406,7 @@ class Interactive(cmd.Cmd):
         parser.add_argument('-f', '--font', type=str, dest='font')
         parser.add_argument('-w', '--width', type=int, default=80, dest='width')
         parser.add_argument('-r', '--random', action='store_true', dest='random')
+        parser.add_argument('--fit', type=int, dest='fit')
         parser.add_argument('-h', '--help', action='store_true', help='Show help message')
 
         parser.error = lambda message: (
@@ -382,21 +429,26 @@ class Interactive(cmd.Cmd):
             MsgDCR.FailureMessage('You cannot use both --font and --random options together.')
             return
         
-        if args.text and (not args.font and not args.random):
-            font = args.font or Config.DEFAULT_FONT
-            print(self._figlet.text2ascii(args.text, font=font))
-            return
-        
-        if args.font:
+        if args.fit is not None:
+            if args.font or args.random:
+                MsgDCR.FailureMessage('The --fit option cannot be combined with --font or --random.')
+                return
+            fitted = self._figlet.fit(args.text, args.fit)
+            if fitted is None:
+                MsgDCR.FailureMessage(f'No font draws the text in {args.fit} columns.')
+                return
+            font, rows = fitted
+            print('-'*4, font, '-'*4)
+        elif args.random:
+            font = random.choice(self._figlet._fonts)
+            print('-'*4, font, '-'*4)
+            rows = self._figlet.iter_lines(args.text, font=font, width=args.width)
+        else:
             font = args.font or Config.DEFAULT_FONT
-            print(self._figlet.text2ascii(args.text, font=font, width=args.width))
-            return
-        
-        if args.random:
-            selected_font = random.choice(self._figlet._fonts)
-            print('-'*4, selected_font, '-'*4)
-            print(self._figlet.text2ascii(args.text, font=selected_font, width=args.width))
-            return
+            rows = self._figlet.iter_lines(args.text, font=font, width=args.width)
+
+        IO.stream_stdout(row + '\n' for row in rows)
+        print()
     
     def do_save(self, argv):
         """
@@ -420,6 +472,16 @@ class Interactive(cmd.Cmd):
             -a, --all
                 Generate ASCII art using all available fonts and save all to the output file.
 
+            -j, --jobs <n>
+                Number of worker processes used with --all (0 = one per CPU, default: 1).
+                Fonts are still written in the same order.
+
+            -i, --incremental
+                With --all, keep a manifest next to the output file and only
+                re-render the fonts whose font file, text, width or pyfiglet
+                version changed. The other sections are copied from the
+                previous output.
+
             -o, --output <file>
                 Specify the output file path. (Required)
 
@@ -444,6 +506,12 @@ class Interactive(cmd.Cmd):
             save --all "Test" -o all_fonts.txt
                 Save ASCII art for "Test" using all available fonts into all_fonts.txt
 
+            save --all -j 4 "Test" -o all_fonts.txt
+                Same as above, rendering on 4 worker processes
+
+            save --all -i "Test" -o all_fonts.txt
+                Update all_fonts.txt, rendering only what changed since the last run
+
             save -h
                 Show detailed usage information for this command.
         """
@@ -458,6 +526,8 @@ class Interactive(cmd.Cmd):
         parser.add_argument('-w', '--width', type=int, default=Config.MAX_WIDTH, dest='width')
         parser.add_argument('-r', '--random', action='store_true', dest='random')
         parser.add_argument('-a', '--all', action='store_true', dest='all_fonts')
+        parser.add_argument('-j', '--jobs', type=int, default=1, dest='jobs')
+        parser.add_argument('-i', '--incremental', action='store_true', dest='incremental')
         parser.add_argument('-o', '--output', type=str, dest='output', required=True)
         parser.add_argument('-h', '--help', action='store_true')
 
@@ -487,31 +557,289 @@ class Interactive(cmd.Cmd):
         text_input = " ".join(args.text)
         output_path = args.output
 
-        outputs = []
+        if args.incremental and not args.all_fonts:
+            MsgDCR.FailureMessage('The --incremental option can only be used with --all.')
+            return
+
+        if args.all_fonts and args.incremental:
+            from core.gallery import FontGallery
+
+            FontGallery(self._figlet, output_path).build(text_input, width=args.width, jobs=args.jobs)
+            return
+
+        if args.all_fonts:
+            blocks = self._figlet.iter_font_blocks(text_input, width=args.width, jobs=args.jobs)
+            IO.stream_file(blocks, total=self._figlet._total_fonts, path=output_path)
+            return
+
+        if args.random:
+            font = random.choice(self._figlet._fonts)
+        else:
+            font = args.font or Config.DEFAULT_FONT
 
+        rows = self._figlet.iter_lines(text_input, font=font, width=args.width)
+        blocks = itertools.chain([f"--- FONT: {font} ---\n"], (row + '\n' for row in rows), ['\n'])
         try:
-            if args.all_fonts:
-                fonts = self._figlet._fonts
-                for font in fonts:
-                    art = self._figlet.text2ascii(text_input, font=font, width=args.width)
-                    outputs.append(f"--- FONT: {font} ---\n{art}\n\n")
-            else:
-                if args.random:
-                    font = random.choice(self._figlet._fonts)
-                else:
-                    font = args.font or Config.DEFAULT_FONT
-                art = self._figlet.text2ascii(text_input, font=font, width=args.width)
-                outputs.append(f"--- FONT: {font} ---\n{art}\n")
+            IO.save_file(blocks, path=output_path)
         except Exception as e:
+            # Rows are rendered while the file is written, save_file reports only the write errors
             MsgDCR.FailureMessage(f"Failed to generate ASCII art: {e}")
+
+    def do_cache(self, argv):
+        """
+        Show or clear the parsed font cache and the render cache
+
+        SYNOPSIS:
+            cache [--clear]
+
+        OPTIONS:
+            -c, --clear
+                Drop every cached font and rendered art and reset the hit/miss counters.
+
+        DESCRIPTION:
+            Parsed fonts are kept in a least-recently-used cache so repeated
+            renders with the same font and width skip re-reading the font file.
+            Rendered art is also kept on disk between sessions, keyed by the
+            text, font, width and pyfiglet version, and the least recently used
+            entries are evicted once it grows past its maximum size.
+            Without options this command prints the cache hits, misses, current
+            size and capacity. The capacities are set with `config --font-cache-size`
+            and `config --render-cache-size`.
+
+        EXAMPLES:
+            cache
+                Show cache statistics
+
+            cache --clear
+                Empty the cache
+        """
+        parser = argparse.ArgumentParser(
+            prog="cache",
+            description="Show or clear the parsed font cache",
+            formatter_class=argparse.RawTextHelpFormatter,
+            add_help=False
+        )
+        parser.add_argument('-c', '--clear', action='store_true')
+        parser.add_argument('-h', '--help', action='store_true')
+        parser.error = lambda message: (
+                            self.do_help("cache") or (_ for _ in ()).throw(ChAsciiGenParserExit(message))
+                        )
+        try:
+            args = parser.parse_args(shlex.split(argv))
+        except SystemExit:
+            MsgDCR.FailureMessage('Invalid syntax. Use `help cache` for usage.')
             return
+        except Exception:
+            return
+
+        if args.help:
+            self.do_help("cache")
+            return
+
+        if args.clear:
+            self._figlet.clear_cache()
+            self._figlet.glyph_engine().clear()
+            MsgDCR.SuccessMessage("Font cache cleared.")
+            if RenderCache.shared().clear():
+                MsgDCR.SuccessMessage("Render cache cleared.")
+            else:
+                MsgDCR.FailureMessage("Failed to clear the render cache.")
+            return
+
+        MsgDCR.InfoMessage("Font Cache")
+        for k, v in self._figlet.cache_info().items():
+            MsgDCR.GeneralMessage(f"{k:<10}: {v}")
+
+        MsgDCR.InfoMessage(f"Render Cache{'' if Config.RENDER_CACHE else ' (off)'}")
+        for k, v in RenderCache.shared().info().items():
+            MsgDCR.GeneralMessage(f"{k:<10}: {v}")
+
+        if Config.RENDER_ENGINE == 'glyph':
+            for name, info in self._figlet.glyph_engine().cache_info().items():
+                MsgDCR.InfoMessage(f"Glyph Engine ({name})")
+                for k, v in info.items():
+                    MsgDCR.GeneralMessage(f"{k:<10}: {v}")
+
+    def do_profile(self, argv):
+        """
+        Time every stage of the following commands
+
+        SYNOPSIS:
+            profile [on|off|show] [--dump <prefix>]
+
+        OPTIONS:
+            on
+                Start profiling. After each command a table shows the wall time
+                and peak memory of every stage it went through.
+
+            off
+                Stop profiling.
 
+            show
+                Show whether profiling is on (the default action).
+
+            -d, --dump <prefix>
+                Write <prefix>.pstats (cProfile, readable with `python -m pstats`)
+                and <prefix>.tracemalloc (memory snapshot) for the session so far.
+
+        DESCRIPTION:
+            The stages are font discovery, font search, font parsing, render/smush,
+            ansi (highlighting), output and file io. Self time excludes the time
+            spent in nested stages. While profiling is off nothing is measured
+            and rendering runs at full speed.
+
+        EXAMPLES:
+            profile on
+                Profile the next commands
+
+            profile --dump session
+                Save session.pstats and session.tracemalloc
+
+            profile off
+                Stop profiling
+        """
+        parser = argparse.ArgumentParser(
+            prog="profile",
+            description="Time every stage of the following commands",
+            formatter_class=argparse.RawTextHelpFormatter,
+            add_help=False
+        )
+        parser.add_argument('action', nargs='?', choices=('on', 'off', 'show'), default='show')
+        parser.add_argument('-d', '--dump', type=str, dest='dump')
+        parser.add_argument('-h', '--help', action='store_true')
+        parser.error = lambda message: (
+                            self.do_help("profile") or (_ for _ in ()).throw(ChAsciiGenParserExit(message))
+                        )
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.writelines(outputs)
-            MsgDCR.SuccessMessage(f"ASCII art saved successfully to: {output_path}")
-        except Exception as e:
-            MsgDCR.FailureMessage(f"Error writing to file: {e}")
+            args = parser.parse_args(shlex.split(argv))
+        except SystemExit:
+            MsgDCR.FailureMessage('Invalid syntax. Use `help profile` for usage.')
+            return
+        except Exception:
+            return
+
+        if args.help:
+            self.do_help("profile")
+            return
+
+        if args.dump:
+            if not PROFILER.enabled:
+                MsgDCR.WarningMessage("Profiling is off, use `profile on` first.")
+                return
+            for path in PROFILER.dump(args.dump):
+                MsgDCR.SuccessMessage(f"Profile written to: {path}")
+        if args.action == 'on':
+            PROFILER.enable()
+            PROFILER.reset()
+            MsgDCR.SuccessMessage("Profiling on.")
+        elif args.action == 'off':
+            PROFILER.disable()
+            MsgDCR.SuccessMessage("Profiling off.")
+        elif not args.dump:
+            MsgDCR.InfoMessage(f"Profiling is {'on' if PROFILER.enabled else 'off'}.")
+
+    def postcmd(self, stop, line):
+        if PROFILER.enabled and PROFILER.stats:
+            PROFILER.report(sys.stdout)
+            PROFILER.reset()
+        if Config.METRICS_DIR:
+            IO.export_metrics()
+        return stop
+
+    def do_stats(self, argv):
+        """
+        Show runtime metrics of this session
+
+        SYNOPSIS:
+            stats [--json | --prometheus] [--export <directory>] [--reset]
+
+        OPTIONS:
+            --json
+                Print every metric as JSON.
+
+            --prometheus
+                Print every metric in the Prometheus text format.
+
+            -e, --export <directory>
+                Write metrics.json and chasciigen.prom into <directory>.
+
+            -r, --reset
+                Set every counter and histogram back to zero.
+
+        DESCRIPTION:
+            Renders are counted and timed per font and engine, font loads are
+            counted by source (compiled cache or parsed .flf), and the bytes
+            written and errors are counted as well. Cache hits, misses and sizes
+            are read from the caches when the metrics are shown or exported.
+            Without options a summary is printed. When `metrics_dir` is set in the
+            config the files are rewritten there after every command, ready for a
+            local scraper such as the node_exporter textfile collector.
+
+        EXAMPLES:
+            stats
+                Show a summary
+
+            stats --prometheus
+                Show the metrics in Prometheus text format
+
+            stats --export ./metrics
+                Write the metrics files into ./metrics
+        """
+        parser = argparse.ArgumentParser(
+            prog="stats",
+            description="Show runtime metrics of this session",
+            formatter_class=argparse.RawTextHelpFormatter,
+            add_help=False
+        )
+        parser.add_argument('--json', action='store_true', dest='json')
+        parser.add_argument('--prometheus', action='store_true', dest='prometheus')
+        parser.add_argument('-e', '--export', type=str, dest='export')
+        parser.add_argument('-r', '--reset', action='store_true', dest='reset')
+        parser.add_argument('-h', '--help', action='store_true')
+        parser.error = lambda message: (
+                            self.do_help("stats") or (_ for _ in ()).throw(ChAsciiGenParserExit(message))
+                        )
+        try:
+            args = parser.parse_args(shlex.split(argv))
+        except SystemExit:
+            MsgDCR.FailureMessage('Invalid syntax. Use `help stats` for usage.')
+            return
+        except Exception:
+            return
+
+        if args.help:
+            self.do_help("stats")
+            return
+
+        if args.reset:
+            METRICS.reset()
+            MsgDCR.SuccessMessage("Metrics reset.")
+            return
+
+        if args.export:
+            for path in IO.export_metrics(args.export):
+                MsgDCR.SuccessMessage(f"Metrics written to: {path}")
+            return
+
+        if args.json:
+            print(json.dumps(METRICS.to_dict(), indent=4))
+            return
+
+        if args.prometheus:
+            print(METRICS.to_prometheus())
+            return
+
+        for name, metric in METRICS.to_dict().items():
+            if not metric['samples']:
+                continue
+            MsgDCR.InfoMessage(f"{name} {Fore.LIGHTBLUE_EX}({Fore.LIGHTWHITE_EX}{metric['help']}{Fore.LIGHTBLUE_EX})")
+            for sample in metric['samples']:
+                labels = ' '.join(f"{k}={v}" for k, v in sample['labels'].items())
+                value = sample['value']
+                if metric['type'] == 'histogram':
+                    mean_ms = value['sum'] * 1000 / value['count'] if value['count'] else 0.0
+                    value = f"{value['count']} renders, mean {mean_ms:.2f} ms"
+                MsgDCR.GeneralMessage(f"{labels:<36}: {value}")
 
     def do_config(self, argv):
         """
@@ -524,6 +852,9 @@ class Interactive(cmd.Cmd):
             --default-font <font>   Set the default font
             --max-width <width>     Set the max width of ASCII art
             --output <path>         Set the default output file
+            --font-cache-size <n>   Set how many parsed fonts are kept in memory
+            --render-cache-size <mb> Set the maximum size of the on-disk render cache (0 turns it off)
+            --engine <name>         Set the rendering engine (pyfiglet, glyph)
             --show                  Display current configuration
             --reset                 Reset configuration to default
 
@@ -542,6 +873,9 @@ class Interactive(cmd.Cmd):
         parser.add_argument('--default-font', type=str)
         parser.add_argument('--output', type=str)
         parser.add_argument('--max-width', type=int)
+        parser.add_argument('--font-cache-size', type=int)
+        parser.add_argument('--render-cache-size', type=int)
+        parser.add_argument('--engine', type=str, choices=RENDER_ENGINES)
         parser.add_argument('--show', action='store_true')
         parser.add_argument('--reset', action='store_true')
         parser.add_argument('-h', '--help', action='store_true')
@@ -588,6 +922,25 @@ class Interactive(cmd.Cmd):
             config['max_width'] = args.max_width
             Config.MAX_WIDTH = args.max_width
             changed = True
+
+        if args.font_cache_size is not None:
+            config['font_cache_size'] = args.font_cache_size
+            Config.FONT_CACHE_SIZE = args.font_cache_size
+            self._figlet.resize_cache(args.font_cache_size)
+            changed = True
+
+        if args.render_cache_size is not None:
+            config['render_cache'] = args.render_cache_size > 0
+            Config.RENDER_CACHE = args.render_cache_size > 0
+            if args.render_cache_size > 0:
+                config['render_cache_max_mb'] = args.render_cache_size
+                Config.RENDER_CACHE_MAX_MB = args.render_cache_size
+            changed = True
+
+        if args.engine:
+            config['render_engine'] = args.engine
+            Config.RENDER_ENGINE = args.engine
+            changed = True
         
         if changed:
             IO.save_config(config)
@@ -3,6 +3,7 @@
 
 import sys
 import argparse
+from typing import List, Optional
 
 from colorama import Fore, init
 init(autoreset=True)
@@ -11,6 +12,7 @@ from core.config import (
     __version__,
     SCRIPT_NAME,
     SCRIPT_DESCRIPTION,
+    RENDER_ENGINES,
     Config
 )
 from cli.formatter import HelpFormatter
@@ -18,25 +20,113 @@ from cli.formatter import HelpFormatter
 
 class Parser:
     
-    def build_parser(self) -> argparse.Namespace:
+    def build_parser(self, argv: Optional[List[str]] = None) -> argparse.Namespace:
         parser = argparse.ArgumentParser(
             prog=SCRIPT_NAME,
             description=SCRIPT_DESCRIPTION,
             formatter_class=HelpFormatter
         )
         parser.add_argument('text', type=str, nargs='?',
-                            help='requirment text for generating Ascii Art')
+                            help='requirment text for generating Ascii Art ("-" reads lines from stdin, put "--" before a text starting with "-")')
+        parser.add_argument('--stdin', action='store_true', dest='stdin',
+                            help='render every line read from stdin, streaming the results to stdout or --output')
         parser.add_argument("-f", "--font", type=str,
-                            help="format style font for generating Ascii Art (Default: standard)", dest="font")
+                            help="format style font for generating Ascii Art, or a fallback chain like slant,standard,term where each character uses the first font that has it (Default: standard)", dest="font")
         parser.add_argument("-w", "--width", type=int,
                             help="max width of generated Ascii Art (Default: 80)", dest="width", default=Config.MAX_WIDTH)
         parser.add_argument('-o', '--output', type=str, dest='output')
+        parser.add_argument('--fit', type=int, dest='fit', metavar='WIDTH',
+                            help='use the biggest font that draws the text in WIDTH columns without wrapping')
+        parser.add_argument('-e', '--engine', type=str, choices=RENDER_ENGINES, dest='engine',
+                            help='rendering engine (Default: pyfiglet)')
         parser.add_argument('-l', '--list-all-fonts', action='store_true', dest='list_all_fonts')
         parser.add_argument('-r', '--random', action='store_true', dest='random')
         parser.add_argument('-a', '--all-fonts', action='store_true', dest='all_fonts')
-        parser.add_argument('-s', '--search-font', type=str, dest='search_font')
+        parser.add_argument('-j', '--jobs', type=int, default=1, dest='jobs',
+                            help='number of worker processes for --all-fonts (0 = one per CPU, Default: 1)')
+        parser.add_argument('--incremental', action='store_true', dest='incremental',
+                            help='with --all-fonts, keep a manifest next to --output and only re-render fonts whose inputs changed')
+        parser.add_argument('--resume', action='store_true', dest='resume',
+                            help='with --all-fonts, continue an interrupted run from its journal, skipping fonts already written')
+        parser.add_argument('--shard', type=str, dest='shard', metavar='I/N',
+                            help='with --all-fonts, render only the I-th of N cost-balanced parts of the fonts; combine the parts with "--merge"')
+        parser.add_argument('-s', '--search-font', type=str, nargs='?', const='', dest='search_font',
+                            help='search fonts by name, optionally narrowed by the filters below')
+        parser.add_argument('--max-height', type=int, default=0, dest='max_height',
+                            help='with -s, only fonts at most this many rows tall')
+        parser.add_argument('--min-height', type=int, default=0, dest='min_height',
+                            help='with -s, only fonts at least this many rows tall')
+        parser.add_argument('--max-glyph-width', type=int, default=0, dest='max_width',
+                            help='with -s, only fonts whose widest glyph fits in this many columns')
+        parser.add_argument('--covers', type=str, default='', dest='covers',
+                            help='with -s, only fonts with a visible glyph for every character, e.g. "0-9:"')
+        parser.add_argument('--rebuild-font-cache', action='store_true', dest='rebuild_font_cache',
+                            help='recompile the on-disk font cache and report the start-up time it saves')
+        parser.add_argument('--cache', action='store_true', dest='cache',
+                            help='read and write the on-disk render cache, which pays off for large renders (Default: off)')
+        parser.add_argument('--no-cache', action='store_true', dest='no_cache',
+                            help='render without reading or writing the on-disk render cache')
+        parser.add_argument('--clear-cache', action='store_true', dest='clear_cache',
+                            help='delete every entry of the on-disk render cache and exit')
+        parser.add_argument('--profile', action='store_true', dest='profile',
+                            help='print wall time and peak memory per stage (font discovery, parsing, rendering, I/O) to stderr')
+        parser.add_argument('--profile-dump', type=str, dest='profile_dump', metavar='PREFIX',
+                            help='with --profile, also write PREFIX.pstats (cProfile) and PREFIX.tracemalloc (memory snapshot)')
+        parser.add_argument('--metrics-dir', type=str, dest='metrics_dir', metavar='DIR',
+                            help='write metrics.json and chasciigen.prom (Prometheus text format) to DIR on exit')
+        # Handled before this parser runs, they are here for --help and to reject them anywhere but first
+        parser.add_argument('--serve', action='store_true', dest='serve',
+                            help='serve ASCII art over HTTP; must come first, see "--serve --help"')
+        parser.add_argument('--daemon', action='store_true', dest='daemon',
+                            help='start, stop or query the warm background daemon; must come first, see "--daemon --help"')
+        parser.add_argument('--merge', action='store_true', dest='merge',
+                            help='combine "--all-fonts --shard" outputs; must come first, see "--merge --help"')
         parser.add_argument("--interactive", action="store_true",
                             help="Force interactive prompts", dest="interactive")
         parser.add_argument("-v", "--version", action="version", version=f"{Fore.LIGHTCYAN_EX}\n [ {Fore.LIGHTWHITE_EX}*{Fore.LIGHTCYAN_EX} ] {Fore.LIGHTWHITE_EX}%(prog)s{Fore.LIGHTRED_EX} v{__version__}",
                             help="Shows script version and exit", dest="version")
-        return parser.parse_args()
\ No newline at end of file
+        return parser.parse_args(argv)
+
+    def build_serve_parser(self, argv: list) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(
+            prog=f'{SCRIPT_NAME} --serve',
+            description='Serve ASCII art over HTTP (GET /render, /fonts, /search)',
+            formatter_class=HelpFormatter
+        )
+        parser.add_argument('--host', type=str, dest='host', default=Config.SERVER_HOST,
+                            help=f'address to listen on (Default: {Config.SERVER_HOST})')
+        parser.add_argument('-p', '--port', type=int, dest='port', default=Config.SERVER_PORT,
+                            help=f'port to listen on (Default: {Config.SERVER_PORT})')
+        parser.add_argument('-j', '--workers', type=int, dest='workers', default=Config.SERVER_WORKERS,
+                            help='number of render worker processes (0 = one per CPU)')
+        parser.add_argument('-e', '--engine', type=str, choices=RENDER_ENGINES, dest='engine',
+                            help='default rendering engine for requests without ?engine=')
+        return parser.parse_args(argv)
+
+    def build_daemon_parser(self, argv: list) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(
+            prog=f'{SCRIPT_NAME} --daemon',
+            description='Keep fonts loaded in a background process that later invocations forward to over a Unix socket',
+            formatter_class=HelpFormatter
+        )
+        parser.add_argument('command', choices=('start', 'stop', 'status', 'run'),
+                            help='start in the background, stop, report on, or run in the foreground')
+        parser.add_argument('--socket', type=str, dest='socket', default='', metavar='PATH',
+                            help='socket to listen on (Default: $CHASCIIGEN_SOCKET, else chasciigen.sock in '
+                                 '$XDG_RUNTIME_DIR, else chasciigen-<uid>.sock in the temp directory)')
+        parser.add_argument('--idle-timeout', type=int, dest='idle_timeout', default=Config.DAEMON_IDLE_TIMEOUT,
+                            metavar='SECONDS',
+                            help=f'exit after this many seconds without a request, 0 = never (Default: {Config.DAEMON_IDLE_TIMEOUT})')
+        return parser.parse_args(argv)
+
+    def build_merge_parser(self, argv: list) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(
+            prog=f'{SCRIPT_NAME} --merge',
+            description='Combine the outputs of "--all-fonts --shard i/N" runs into one all-fonts file',
+            formatter_class=HelpFormatter
+        )
+        parser.add_argument('shards', nargs='+', metavar='SHARD',
+                            help='output file of each shard, in any order')
+        parser.add_argument('-o', '--output', type=str, dest='output', required=True,
+                            help='file to write the merged output to')
+        return parser.parse_args(argv)
@@ -3,21 +3,130 @@
 
 from __future__ import annotations
 
+import os
 import shutil
 import re
+import time
+import weakref
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
 
-from pyfiglet import FigletFont, figlet_format
+from pyfiglet import FigletFont, Figlet as PyFiglet
 from colorama import Fore, init
 init(autoreset=True)
 
+from core.cache import LRUCache
+from core.config import Config
+from core.engine import GlyphEngine
+from core.exception import ChAsciiGenFontError
+from core.font_cache import CompiledFontCache
+from core.font_chain import FontChain
+from core.font_fit import GlyphMetrics
+from core.font_index import FontIndex
+from core.font_search import subsequence_positions
+from core.metrics import CACHE_STATS, ERRORS, FONT_LOADS, METRICS, RENDER_SECONDS
+from core.profiler import PROFILER
+from core.registry import FontRegistry
+from core.render_cache import RenderCache
 from ui.decorators import MsgDCR
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, ProcessPoolExecutor
+
+_ANSI_ESCAPE = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
+
+
+def _init_worker(settings: Dict[str, object]) -> None:
+    # Workers may be spawned rather than forked, so copy the parent's settings over.
+    for name, value in settings.items():
+        setattr(Config, name, value)
+    Figlet.resize_cache(Config.FONT_CACHE_SIZE)
+
+
+def _render_font_job(text: str, font: str, width: int, engine: str = '') -> Tuple[str, str, Optional[str]]:
+    # Module level so it can be pickled into process pool workers.
+    try:
+        return font, Figlet.render(text, font, width, engine), None
+    except Exception as e:
+        return font, '', str(e) or e.__class__.__name__
+
+
+def _render_text_job(text: str, fonts: Tuple[str, ...], width: int, engine: str = '') -> str:
+    # Module level so it can be pickled into process pool workers; `fonts` are already resolved.
+    return ''.join(row + '\n' for row in Figlet.resolved_lines(text, fonts, width, engine))
+
+
+def _search_job(keyword: str, filters: Dict[str, Any]) -> List[str]:
+    return Figlet().find_fonts(keyword, **filters)
+
+
+def _iter_text_lines(text: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Yield the lines of a str, or of every str in an iterable, each keeping its trailing newline."""
+    if not isinstance(text, str):
+        for chunk in text:
+            yield from _iter_text_lines(chunk)
+        return
+    start = 0
+    while True:
+        end = text.find('\n', start) + 1
+        if not end:
+            break
+        yield text[start:end]
+        start = end
+    if start < len(text):
+        yield text[start:]
+
+
+def _split_rows(art: str) -> List[str]:
+    """The rows of a rendered block, which ends with a newline unless it is empty."""
+    return art[:-1].split('\n') if art else []
+
+
+class RenderResult(NamedTuple):
+    text: str
+    font: str
+    width: int
+    art: str
+    error: Optional[str] = None
+
+
+class _Renderer(PyFiglet):
+    """pyfiglet renderer that takes its font from the compiled on-disk font cache."""
+
+    def setFont(self, **kwargs: str) -> None:
+        if 'font' in kwargs:
+            self.font = kwargs['font']
+        self.Font = Figlet.load_font(self.font)
+
 
 class Figlet:
+    # Parsed fonts are shared by every Figlet instance in the process, keyed by (font, width).
+    _renderers = LRUCache(Config.FONT_CACHE_SIZE)
+    _glyph_engine: Optional[GlyphEngine] = None
+    _executor: Optional[Executor] = None
+    # The pool set_executor built itself, shut down when it is replaced
+    _owned_executor: Optional[Executor] = None
+    _async_concurrency: int = 0
+    _async_stats: Dict[str, int] = {'jobs': 0, 'coalesced': 0}
+    # Per event loop: (semaphore, in-flight jobs by request), asyncio objects cannot be shared between loops
+    _async_state: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
     def __init__(self) -> None:
-        self._fonts = FigletFont.getFonts()
-        self._total_fonts = len(self._fonts)
+        # Font names come from the process-wide registry, which is only loaded on first use.
+        self._registry = FontRegistry.shared()
         self._term_width = shutil.get_terminal_size().columns
+
+    @property
+    def _fonts(self) -> List[str]:
+        return self._registry.fonts
+
+    @property
+    def _total_fonts(self) -> int:
+        return len(self._registry)
+
+    @property
+    def _font_index(self) -> Dict[str, int]:
+        return self._registry.index
     
     def showfonts(self, margin_left: int = 4) -> None:
         numbered_fonts = [f"{i+1}. {font}" for i, font in enumerate(self._fonts)]
@@ -35,51 +144,519 @@ class Figlet:
         print('\n'.join(fonts))
         print()
     
-    def text2ascii(self, text:str, font: str = 'standard', width: int = 80):
+    def resolve_font(self, font: str) -> str:
+        """Turn a font name or 1-based font number into a font name, raising ChAsciiGenFontError."""
         if font.isdigit():
             font_number = int(font)
             if 1 <= font_number <= self._total_fonts:
-                selected_font = self._fonts[font_number - 1]
+                return self._fonts[font_number - 1]
+            ERRORS.inc(kind='font_lookup')
+            raise ChAsciiGenFontError('Invalid number! Please enter valid font number.')
+        if font in self._font_index:
+            return font
+        ERRORS.inc(kind='font_lookup')
+        raise ChAsciiGenFontError('Invalid font name! Please enter valid font name.')
+
+    def resolve_fonts(self, font: str) -> List[str]:
+        """Resolve a comma separated fallback chain ("slant,standard,term") with resolve_font."""
+        return [self.resolve_font(name.strip()) for name in font.split(',')]
+
+    def text2ascii(self, text:str, font: str = 'standard', width: int = 80):
+        try:
+            selected_fonts = self.resolve_fonts(font)
+        except ChAsciiGenFontError as e:
+            MsgDCR.FailureMessage(str(e))
+            return ''
+        
+        if len(selected_fonts) > 1:
+            return ''.join(row + '\n' for row in self.render_chain_lines(text, selected_fonts, width))
+        return self.render(text, selected_fonts[0], width)
+
+    def iter_lines(self, text: Union[str, Iterable[str]], font: str = 'standard', width: int = 80,
+                   engine: str = '') -> Iterator[str]:
+        """
+        Lazily render `text`, yielding the output rows without line endings.
+
+        The rows are those of text2ascii, but `text` may also be an iterable
+        of lines such as an open file. Input lines are rendered one at a time,
+        so memory follows the longest input line rather than the whole text.
+        A str text is looked up in the on-disk RenderCache first, unless
+        Config.RENDER_CACHE is off, and stored there after rendering.
+        `font` may be a comma separated fallback chain, see render_chain_lines.
+        """
+        try:
+            selected_fonts = self.resolve_fonts(font)
+        except ChAsciiGenFontError as e:
+            MsgDCR.FailureMessage(str(e))
+            return
+        yield from self.resolved_lines(text, selected_fonts, width, engine)
+
+    @classmethod
+    def resolved_lines(cls, text: Union[str, Iterable[str]], fonts: Sequence[str], width: int = 80,
+                       engine: str = '') -> Iterator[str]:
+        """iter_lines for an already resolved font or fallback chain."""
+        selected_font = ','.join(fonts)
+        if len(fonts) > 1:
+            rows = cls.render_chain_lines(text, fonts, width, engine)
+        else:
+            rows = cls.render_lines(text, selected_font, width, engine)
+        if not (Config.RENDER_CACHE and isinstance(text, str)):
+            yield from rows
+            return
+
+        cache = RenderCache.shared()
+        key = cache.key(text, selected_font, width)
+        cached = cache.get(key)
+        if cached is not None:
+            yield from cached
+            return
+        yield from cache.tee(key, rows)
+
+    def fit(self, text: str, width: int) -> Optional[Tuple[str, List[str]]]:
+        """
+        Pick the biggest font that draws `text` in at most `width` columns without wrapping.
+
+        Fonts are ranked on widths estimated from the precomputed GlyphMetrics,
+        so nothing is rendered to rank them. Only the best candidate is
+        rendered to confirm it fits, falling back to the next one if it does
+        not. Returns (font, rows) or None when no font fits.
+        """
+        with PROFILER.stage('font search'):
+            ranked = GlyphMetrics.shared().rank(text, width)
+        lines = len(text.rstrip('\n').split('\n'))
+        for font, _ in ranked:
+            try:
+                # pyfiglet wraps once a row would reach the width, so width + 1 allows rows of `width` columns
+                rows = list(self.render_lines(text, font, width + 1))
+                height = self.renderer(font, width + 1).Font.height
+            except Exception:
+                continue
+            if len(rows) == height * lines and all(len(row) <= width for row in rows):
+                return font, rows
+        return None
+
+    def render_many(self, items: Iterable[Union[str, Tuple]], font: str = '', width: int = 0,
+                    engine: str = '') -> Iterator[RenderResult]:
+        """
+        Render a batch of texts, yielding one RenderResult per item in input order.
+
+        Each item is either a text or a (text, font, width) tuple whose font and
+        width may be omitted; `font` and `width` are the defaults for those.
+        Fonts may be fallback chains ("slant,standard") as in iter_lines.
+        Font resolution and renderer setup happen once per distinct font and
+        width, and failures are returned in `RenderResult.error` instead of
+        being printed.
+        """
+        font = font or Config.DEFAULT_FONT
+        width = width or Config.MAX_WIDTH
+        resolved: Dict[str, Union[str, ChAsciiGenFontError]] = {}
+        renderers: Dict[Tuple[str, int], PyFiglet] = {}
+
+        for item in items:
+            if isinstance(item, str):
+                text, item_font, item_width = item, font, width
             else:
-                MsgDCR.FailureMessage('Invalid number! Please enter valid font number.')
-                return ''
+                item = tuple(item)
+                text, item_font, item_width = item[:3] + ('', font, width)[len(item):]
+                item_font = item_font or font
+                item_width = item_width or width
+
+            if item_font not in resolved:
+                try:
+                    resolved[item_font] = ','.join(self.resolve_fonts(item_font))
+                except ChAsciiGenFontError as e:
+                    resolved[item_font] = e
+            name = resolved[item_font]
+            if isinstance(name, ChAsciiGenFontError):
+                yield RenderResult(text, item_font, item_width, '', str(name))
+                continue
+
+            try:
+                if ',' in name:
+                    art = self.render(text, name, item_width, engine)
+                else:
+                    renderer = renderers.get((name, item_width))
+                    if renderer is None:
+                        renderer = renderers[(name, item_width)] = self.renderer(name, item_width)
+                    art = self.render_with(renderer, text, item_width, engine)
+            except Exception as e:
+                yield RenderResult(text, name, item_width, '', str(e) or e.__class__.__name__)
+                continue
+            yield RenderResult(text, name, item_width, art)
+
+    @staticmethod
+    def process_pool(workers: int = 0) -> ProcessPoolExecutor:
+        """A process pool whose workers render with a copy of this process's Config (0 workers = one per CPU)."""
+        from concurrent.futures import ProcessPoolExecutor
+
+        settings = {name: value for name, value in vars(Config).items() if name.isupper()}
+        return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                   initializer=_init_worker, initargs=(settings,))
+
+    @classmethod
+    def set_executor(cls, executor: Optional[Executor] = None, concurrency: int = 0, workers: int = 0) -> None:
+        """
+        Choose where arender, arender_many and asearch run their CPU work.
+
+        `executor` defaults to the event loop's default thread pool. A process
+        pool also takes the renders off the event loop's GIL: pass `workers`
+        to have one built by process_pool, which is shut down again when the
+        executor is replaced. A ProcessPoolExecutor passed in as `executor`
+        must be made by process_pool too (or with its initializer), otherwise
+        its workers render with the default Config. `concurrency` caps the
+        jobs in flight per event loop (0 = Config.ASYNC_CONCURRENCY, or one
+        per CPU when that is 0 too); the other requests wait on the loop
+        without holding an executor thread.
+        """
+        if cls._owned_executor is not None:
+            cls._owned_executor.shutdown(wait=False, cancel_futures=True)
+            cls._owned_executor = None
+        if executor is None and workers:
+            executor = cls._owned_executor = cls.process_pool(workers)
+        cls._executor = executor
+        cls._async_concurrency = concurrency
+        cls._async_state = weakref.WeakKeyDictionary()
+
+    @classmethod
+    async def _offload(cls, key: Tuple, job: Callable, *args: Any) -> Any:
+        """Run job(*args) on the executor; identical concurrent requests (same `key`) share one run."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        state = cls._async_state.get(loop)
+        if state is None:
+            limit = cls._async_concurrency or Config.ASYNC_CONCURRENCY or os.cpu_count() or 1
+            state = cls._async_state[loop] = (asyncio.Semaphore(limit), {})
+        slots, inflight = state
+
+        future = inflight.get(key)
+        if future is None:
+            cls._async_stats['jobs'] += 1
+            future = asyncio.ensure_future(cls._submit(slots, job, *args))
+            inflight[key] = future
+            future.add_done_callback(lambda _: inflight.pop(key, None))
         else:
-            if font in self._fonts:
-                selected_font = font
+            cls._async_stats['coalesced'] += 1
+        # Shielded so one caller being cancelled does not cancel the job for the others
+        return await asyncio.shield(future)
+
+    @classmethod
+    async def _submit(cls, slots, job: Callable, *args: Any) -> Any:
+        import asyncio
+
+        async with slots:
+            return await asyncio.get_running_loop().run_in_executor(cls._executor, job, *args)
+
+    @classmethod
+    def async_info(cls) -> Dict[str, int]:
+        """Jobs run and requests coalesced onto a running job by the async API, and the jobs in flight now."""
+        inflight = sum(len(jobs) for _, jobs in cls._async_state.values())
+        return dict(cls._async_stats, inflight=inflight)
+
+    async def arender(self, text: str, font: str = '', width: int = 0, engine: str = '') -> str:
+        """
+        text2ascii for asyncio code: the render runs on the executor (see set_executor).
+
+        `font` and `width` default to Config.DEFAULT_FONT and Config.MAX_WIDTH.
+        Unlike text2ascii an unknown font raises ChAsciiGenFontError, and a
+        failed render raises instead of printing. Results come from and go to
+        the RenderCache like iter_lines.
+        """
+        fonts = tuple(self.resolve_fonts(font or Config.DEFAULT_FONT))
+        width = width or Config.MAX_WIDTH
+        engine = engine or Config.RENDER_ENGINE
+        return await self._offload(('render', text, fonts, width, engine), _render_text_job, text, fonts, width, engine)
+
+    async def arender_many(self, items: Iterable[Union[str, Tuple]], font: str = '', width: int = 0,
+                           engine: str = '') -> List[RenderResult]:
+        """
+        Render a batch of texts concurrently, returning one RenderResult per item in input order.
+
+        Items and defaults are as for render_many, and failures are returned
+        in `RenderResult.error` as well. Items are rendered under the same
+        concurrency cap as arender, so a large batch does not crowd out
+        other requests.
+        """
+        import asyncio
+
+        font = font or Config.DEFAULT_FONT
+        width = width or Config.MAX_WIDTH
+
+        async def one(item: Union[str, Tuple]) -> RenderResult:
+            if isinstance(item, str):
+                text, item_font, item_width = item, font, width
             else:
-                MsgDCR.FailureMessage('Invalid font name! Please enter valid font name.')
-                return ''
-        
-        return str(figlet_format(text, font=selected_font, width=width))
+                item = tuple(item)
+                text, item_font, item_width = item[:3] + ('', font, width)[len(item):]
+                item_font = item_font or font
+                item_width = item_width or width
+            try:
+                name = ','.join(self.resolve_fonts(item_font))
+            except ChAsciiGenFontError as e:
+                return RenderResult(text, item_font, item_width, '', str(e))
+            try:
+                art = await self.arender(text, name, item_width, engine)
+            except Exception as e:
+                return RenderResult(text, name, item_width, '', str(e) or e.__class__.__name__)
+            return RenderResult(text, name, item_width, art)
+
+        return list(await asyncio.gather(*(one(item) for item in items)))
+
+    async def asearch(self, keyword: str = '', **filters: Any) -> List[str]:
+        """find_fonts for asyncio code; the first search loads the FontIndex, which can take a while."""
+        key = ('search', keyword, tuple(sorted(filters.items())))
+        return await self._offload(key, _search_job, keyword, filters)
+
+    @classmethod
+    def render(cls, text: str, font: str, width: int = 80, engine: str = '') -> str:
+        """Render `text` with an already resolved font name, or a comma separated chain of them, using the configured engine."""
+        if ',' in font:
+            return ''.join(row + '\n' for row in cls.render_chain_lines(text, font.split(','), width, engine))
+        return cls.render_with(cls.renderer(font, width), text, width, engine)
+
+    @classmethod
+    def render_lines(cls, text: Union[str, Iterable[str]], font: str, width: int = 80,
+                     engine: str = '') -> Iterator[str]:
+        """Row by row counterpart of `render`, see iter_lines."""
+        renderer = cls.renderer(font, width)
+        for line in _iter_text_lines(text):
+            # pyfiglet starts afresh after every newline, so rendering a line with its newline
+            # gives exactly that line's block of the whole text, blank and justified rows included
+            yield from _split_rows(cls.render_with(renderer, line, width, engine))
+
+    @classmethod
+    def render_chain_lines(cls, text: Union[str, Iterable[str]], fonts: Sequence[str], width: int = 80,
+                           engine: str = '') -> Iterator[str]:
+        """
+        Row by row render of `text` through a font fallback chain of resolved fonts.
+
+        Every character is drawn with the first font that has it (see
+        FontChain). Each input line is wrapped on estimated widths, split into
+        runs of one font, and the runs are rendered and set side by side,
+        aligned on their baselines. Characters are not smushed across runs.
+        """
+        chain = FontChain(fonts)
+        for line in _iter_text_lines(text):
+            drawn = False
+            for piece in chain.wrap(line.rstrip('\n'), width):
+                for row in cls._compose(chain.runs(piece), width, engine):
+                    drawn = True
+                    yield row
+            if not drawn and line.endswith('\n'):
+                # pyfiglet turns a line that draws nothing into a block of blank rows, justified like the font
+                yield from _split_rows(cls.render_with(cls.renderer(fonts[0], width), '\n', width, engine))
+
+    @classmethod
+    def _compose(cls, runs: List[Tuple[str, str]], width: int, engine: str) -> List[str]:
+        index = FontIndex.shared()
+        blocks = []
+        for font, run in runs:
+            renderer = cls.renderer(font, width)
+            art = cls.render_with(renderer, run, width, engine)
+            rows = (art[:-1] if art.endswith('\n') else art).split('\n')
+            if renderer.justify == 'right':
+                # Drop the justification padding, the run is placed next to the others
+                indent = min(len(row) - len(row.lstrip(' ')) for row in rows)
+                rows = [row[indent:] for row in rows]
+            block_width = max(len(row) for row in rows)
+            info = index.get(font)
+            baseline = info.baseline if info is not None and 0 < info.baseline <= len(rows) else len(rows)
+            blocks.append(([row.ljust(block_width) for row in rows], baseline, block_width))
+
+        if not blocks:
+            return []
+        ascent = max(baseline for _, baseline, _ in blocks)
+        descent = max(len(rows) - baseline for rows, baseline, _ in blocks)
+        composed = []
+        for i in range(ascent + descent):
+            line = ''
+            for rows, baseline, block_width in blocks:
+                row = i - (ascent - baseline)
+                line += rows[row] if 0 <= row < len(rows) else ' ' * block_width
+            composed.append(line)
+        return composed
+
+    @classmethod
+    def render_with(cls, renderer: PyFiglet, text: str, width: int, engine: str = '') -> str:
+        engine = engine or Config.RENDER_ENGINE
+        start = time.perf_counter()
+        try:
+            with PROFILER.stage('render/smush'):
+                if engine == 'glyph':
+                    art = cls.glyph_engine().render(renderer.Font, text, width, renderer.direction, renderer.justify)
+                else:
+                    art = str(renderer.renderText(text))
+        except Exception:
+            ERRORS.inc(kind='render')
+            raise
+        RENDER_SECONDS.observe(time.perf_counter() - start, font=renderer.font, engine=engine)
+        return art
+
+    @classmethod
+    def glyph_engine(cls) -> GlyphEngine:
+        if cls._glyph_engine is None:
+            cls._glyph_engine = GlyphEngine()
+        return cls._glyph_engine
+
+    def render_all_fonts(self, text: str, width: int = 80, jobs: int = 1,
+                         fonts: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        Render `text` with every font (or only `fonts`), yielding (font, art, error) in font order.
+
+        With `jobs` > 1 (or 0 for one job per CPU) the renders are spread over a
+        process pool. Only a small window of renders is in flight at once and the
+        results are still yielded in the order of the fonts.
+        """
+        fonts = iter(self._fonts if fonts is None else fonts)
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+
+        if jobs <= 1:
+            for font in fonts:
+                yield _render_font_job(text, font, width)
+            return
+
+        with self.process_pool(jobs) as pool:
+            pending = deque()
+            for font in fonts:
+                pending.append((font, pool.submit(_render_font_job, text, font, width)))
+                if len(pending) >= jobs * 2:
+                    break
+
+            while pending:
+                font, future = pending.popleft()
+                next_font = next(fonts, None)
+                if next_font is not None:
+                    pending.append((next_font, pool.submit(_render_font_job, text, next_font, width)))
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield font, '', str(e) or e.__class__.__name__
+
+    def iter_font_blocks(self, text: str, width: int = 80, jobs: int = 1) -> Iterator[str]:
+        """Yield one `--- FONT: x ---` block per font, reporting fonts that fail to render."""
+        for font, art, error in self.render_all_fonts(text, width=width, jobs=jobs):
+            if error:
+                MsgDCR.FailureMessage(f"Failed to render font '{font}': {error}")
+                continue
+            yield self.font_block(font, art)
+
+    @staticmethod
+    def font_block(font: str, art: str) -> str:
+        """The section of one font in all-fonts output."""
+        return f"--- FONT: {font} ---\n{art}\n\n"
+
+    @classmethod
+    def renderer(cls, font: str, width: int = 80) -> PyFiglet:
+        return cls._renderers.get_or_create(
+            (font, width),
+            lambda: _Renderer(font=font, width=width)
+        )
+
+    @staticmethod
+    def load_font(font: str) -> FigletFont:
+        with PROFILER.stage('font parsing'):
+            if Config.COMPILED_FONT_CACHE:
+                return CompiledFontCache().get(font)
+            FONT_LOADS.inc(source='parsed')
+            return FigletFont(font)
+
+    def rebuild_font_cache(self) -> dict:
+        stats = CompiledFontCache().rebuild(self._registry.refresh())
+        FontIndex.shared().rebuild()
+        return stats
+
+    @classmethod
+    def cache_info(cls) -> dict:
+        return cls._renderers.info()
+
+    @classmethod
+    def collect_metrics(cls) -> None:
+        """Copy the cache counters into the metrics registry, called right before every export."""
+        caches = {'renderer': cls._renderers.info()}
+        if RenderCache._shared is not None:
+            caches['render'] = RenderCache._shared.info()
+        if cls._glyph_engine is not None:
+            for kind, info in cls._glyph_engine.cache_info().items():
+                caches[f'glyph_{kind}'] = info
+        for cache, info in caches.items():
+            for key in ('hits', 'misses', 'size'):
+                CACHE_STATS.set(info[key], cache=cache, stat=key)
+
+    @classmethod
+    def resize_cache(cls, capacity: int) -> None:
+        cls._renderers.resize(capacity)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._renderers.clear()
 
     def highlight(self, keyword: str, text:str):
-        i = 0
-        result = ""
-        while i < len(text):
-            if text[i:i+len(keyword)].lower() == keyword.lower():
-                result += Fore.RED + text[i:i+len(keyword)] + Fore.RESET
-                i += len(keyword)
-            else:
-                result += text[i]
-                i += 1
-        return result
+        """
+        Colour `keyword` in `text` in a single pass.
+
+        Every case-insensitive occurrence is coloured; for a fuzzy match with
+        no occurrence the keyword's letters are coloured where they appear in order.
+        """
+        if not keyword:
+            return text
+        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+        if pattern.search(text):
+            return pattern.sub(lambda m: Fore.RED + m.group(0) + Fore.RESET, text)
+
+        positions = subsequence_positions(keyword.lower(), text.lower())
+        if positions is None:
+            return text
+        parts = []
+        last = 0
+        for i in positions:
+            parts.append(text[last:i])
+            parts.append(Fore.RED + text[i] + Fore.RESET)
+            last = i + 1
+        parts.append(text[last:])
+        return ''.join(parts)
 
     def strip_ansi_codes(self, text: str) -> str:
-        ansi_escape = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
-        return ansi_escape.sub('', text)
+        return _ANSI_ESCAPE.sub('', text)
+
+    def find_fonts(self, keyword: str = '', **filters) -> List[str]:
+        """
+        Return the fonts matching `keyword`, best match first.
 
-    def search_font(self, keyword: str, margin_left: int = 4, info_mesage: bool = False):
-        filtered_fonts = [font for font in self._fonts if keyword.lower() in font.lower()]
+        Matching is case-insensitive and typo tolerant (see FontNameIndex).
+        Any of the FontIndex.query filters (max_height, min_height, max_width,
+        covers) that are set narrow the result using the font metadata index.
+        """
+        with PROFILER.stage('font search'):
+            filtered = FontIndex.shared().query(**filters) if any(filters.values()) else None
+            if not keyword:
+                return filtered if filtered is not None else list(self._fonts)
+            ranked = self._registry.name_index.search(keyword)
+        if filtered is None:
+            return ranked
+        allowed = set(filtered)
+        return [font for font in ranked if font in allowed]
+
+    def search_font(self, keyword: str = '', margin_left: int = 4, info_mesage: bool = False, **filters):
+        try:
+            filtered_fonts = self.find_fonts(keyword, **filters)
+        except ValueError as e:
+            MsgDCR.FailureMessage(f"Invalid --covers character set: {e}")
+            return
         
         if not filtered_fonts:
-            MsgDCR.WarningMessage(f"No fonts found containing keyword: {Fore.LIGHTWHITE_EX}'{Fore.LIGHTRED_EX}{keyword}{Fore.LIGHTWHITE_EX}'")
+            if any(filters.values()):
+                MsgDCR.WarningMessage("No fonts found matching the given filters.")
+            else:
+                MsgDCR.WarningMessage(f"No fonts found matching keyword: {Fore.LIGHTWHITE_EX}'{Fore.LIGHTRED_EX}{keyword}{Fore.LIGHTWHITE_EX}'")
             return
 
         numbered_fonts_raw = [f"{i+1}. {font}" for i, font in enumerate(filtered_fonts)]
-        max_len = max(len(self.strip_ansi_codes(item)) for item in numbered_fonts_raw) + 4
+        max_len = max(len(item) for item in numbered_fonts_raw) + 4
         cols = max(1, self._term_width // max_len)
         rows = (len(numbered_fonts_raw) + cols - 1) // cols
-        highlighted_fonts = [self.highlight(keyword, item) for item in numbered_fonts_raw]
+        with PROFILER.stage('ansi'):
+            highlighted_fonts = [f"{i+1}. {self.highlight(keyword, font)}" for i, font in enumerate(filtered_fonts)]
 
         output_lines = []
         for row in range(rows):
@@ -87,13 +664,18 @@ class Figlet:
             for col in range(cols):
                 idx = row * cols + col
                 if idx < len(highlighted_fonts):
-                    item = highlighted_fonts[idx]
-                    padding = max_len - len(self.strip_ansi_codes(item))
-                    line += item + ' ' * padding
+                    # Pad by the uncoloured length, the colour codes take no columns
+                    padding = max_len - len(numbered_fonts_raw[idx])
+                    line += highlighted_fonts[idx] + ' ' * padding
             output_lines.append((' '*margin_left) + line)
         
         if info_mesage:
-            if output_lines:
-                MsgDCR.InfoMessage(f"Founded fonts with containing keyword: {Fore.LIGHTWHITE_EX}'{Fore.LIGHTRED_EX}{keyword}{Fore.LIGHTWHITE_EX}':\n")
+            if output_lines and not keyword:
+                MsgDCR.InfoMessage(f"Founded fonts matching the given filters {Fore.LIGHTBLUE_EX}({Fore.LIGHTWHITE_EX}{len(filtered_fonts)}{Fore.LIGHTBLUE_EX}){Fore.LIGHTWHITE_EX}:\n")
+            elif output_lines:
+                MsgDCR.InfoMessage(f"Founded fonts matching keyword: {Fore.LIGHTWHITE_EX}'{Fore.LIGHTRED_EX}{keyword}{Fore.LIGHTWHITE_EX}':\n")
         print('\n'.join(output_lines))
-        print()
\ No newline at end of file
+        print()
+
+
+METRICS.on_collect(Figlet.collect_metrics)
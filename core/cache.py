@@ -0,0 +1,102 @@
+# -*- coding: UTF-8 -*-
+# core/cache.py
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A small thread-safe, size-bounded cache with least-recently-used eviction.
+
+    `capacity` counts entries, or with a `weigh` function the total weight
+    (e.g. bytes) of the values, in which case a value heavier than the whole
+    capacity is not stored at all.
+    """
+
+    def __init__(self, capacity: int = 32, weigh: Optional[Callable[[Any], int]] = None) -> None:
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._weigh = weigh
+        self._weights: Dict[Hashable, int] = {}
+        self.capacity = max(0, int(capacity))
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if self._weigh is not None:
+                weight = self._weigh(value)
+                if weight > self.capacity:
+                    return
+                self.weight += weight - self._weights.get(key, 0)
+                self._weights[key] = weight
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, building it with `factory` on a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # Build outside the lock so a slow factory does not block other lookups.
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def resize(self, capacity: int) -> None:
+        with self._lock:
+            self.capacity = max(0, int(capacity))
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        info = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._data),
+            'capacity': self.capacity,
+        }
+        if self._weigh is not None:
+            info['weight'] = self.weight
+        return info
+
+    def _evict(self) -> None:
+        if self._weigh is None:
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+            return
+        while self._data and self.weight > self.capacity:
+            key, _ = self._data.popitem(last=False)
+            self.weight -= self._weights.pop(key)
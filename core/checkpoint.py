@@ -0,0 +1,181 @@
+# -*- coding: UTF-8 -*-
+# core/checkpoint.py
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import hashlib
+from typing import List, Optional, Set, Tuple
+
+from core.ascii_art import Figlet
+from core.config import Config
+from core.io import IO
+from core.metrics import BYTES_WRITTEN, ERRORS
+from core.profiler import PROFILER
+from ui.decorators import MsgDCR
+
+
+class CheckpointedRun:
+    """
+    All-fonts output that survives being interrupted.
+
+    Every finished font block is appended to the output file and synced to
+    disk, then recorded in a sidecar journal (`<output>.journal`): a JSON
+    header identifying the run followed by one JSON line per font holding the
+    output size after the block and the block hash. A resumed run replays the
+    journal, drops entries the output file does not back up, cuts off a torn
+    last block and renders only the fonts that are not done yet; fonts that
+    failed are tried again, their blocks then follow the others. The journal
+    is removed once the run completes.
+
+    Blocks and journal lines are only synced to disk in resumed and sharded
+    runs; a plain run flushes them, which still survives the process being
+    killed. An output that is not a regular file (/dev/stdout, a FIFO) cannot
+    be resumed, so it is streamed without a journal.
+    """
+
+    FORMAT_VERSION = 1
+    SUFFIX = '.journal'
+
+    def __init__(self, figlet: Figlet, path: str = '') -> None:
+        self.figlet = figlet
+        self.path = path or Config.OUTPUT_FILE
+        self.journal_path = os.path.realpath(self.path) + self.SUFFIX
+        self.entries: List[list] = []
+
+    def header(self, text: str, width: int, fonts: Optional[List[str]] = None) -> dict:
+        header = {
+            'version': self.FORMAT_VERSION,
+            'text': hashlib.sha256(text.encode('utf-8')).hexdigest(),
+            'width': width,
+        }
+        if fonts is not None:
+            # A run over part of the fonts (a shard) only resumes the same part
+            header['fonts'] = hashlib.sha256('\n'.join(fonts).encode('utf-8')).hexdigest()
+        return header
+
+    def recover(self, header: dict) -> Tuple[int, List[list]]:
+        """
+        Return (output size, journal entries) of the finished part of an earlier run.
+
+        Gives (0, []) when there is no journal for the same text and width.
+        Entries past the end of the output file or whose block no longer
+        matches its hash are dropped, so the result always describes an
+        intact prefix of the output.
+        """
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                if json.loads(f.readline() or 'null') != header:
+                    return 0, []
+                entries = []
+                for line in f:
+                    # A line without its newline was torn by the interruption
+                    if not line.endswith('\n'):
+                        break
+                    entries.append(json.loads(line))
+            size = os.path.getsize(self.path)
+        except (OSError, ValueError):
+            return 0, []
+
+        try:
+            with open(self.path, 'rb') as out:
+                while entries:
+                    _, end, digest, _ = entries[-1]
+                    start = entries[-2][1] if len(entries) > 1 else 0
+                    if end <= size:
+                        out.seek(start)
+                        block = out.read(end - start)
+                        if digest is None or hashlib.sha256(block).hexdigest() == digest:
+                            break
+                    entries.pop()
+        except (OSError, ValueError, TypeError):
+            return 0, []
+        return (entries[-1][1] if entries else 0), entries
+
+    def run(self, text: str, width: int = 80, jobs: int = 1, resume: bool = False,
+            fonts: Optional[List[str]] = None) -> bool:
+        """
+        Render every font (or only `fonts`) to the output file.
+
+        On success `self.entries` holds the journal entries of the whole run,
+        [font, output size after the block, block hash, error] in output order.
+        """
+        if not IO.is_regular_output(self.path):
+            if resume or fonts is not None:
+                MsgDCR.FailureMessage(f'{self.path} is not a regular file, --resume and --shard need one.')
+                return False
+            return IO.stream_file(self.figlet.iter_font_blocks(text, width=width, jobs=jobs),
+                                  total=len(self.figlet._fonts), path=self.path)
+
+        durable = resume or fonts is not None
+        header = self.header(text, width, fonts)
+        offset, entries = self.recover(header) if resume else (0, [])
+        # A failure may be transient (a crashed worker, a MemoryError at a big width), so only
+        # rendered fonts are done; failed entries own no bytes of the output and can just go
+        entries = [entry for entry in entries if entry[3] is None]
+        done: Set[str] = {entry[0] for entry in entries}
+        if resume and not entries:
+            MsgDCR.WarningMessage('No checkpoint to resume from, starting from the first font.')
+        elif resume:
+            MsgDCR.InfoMessage(f'Resuming after {len(done)} finished fonts.')
+
+        fonts = [font for font in (self.figlet._fonts if fonts is None else fonts) if font not in done]
+        total = len(done) + len(fonts)
+        show_progress = total > 0 and sys.stdout.isatty()
+        written = len(done)
+        try:
+            if not os.path.exists(self.path):
+                os.makedirs(os.path.dirname(os.path.realpath(self.path)), exist_ok=True)
+
+            self._write_journal([header] + entries, durable)
+            with open(self.path, 'r+b' if offset else 'wb') as out, \
+                    open(self.journal_path, 'a', encoding='utf-8') as journal:
+                # Drop whatever a killed run left after its last journaled block
+                out.truncate(offset)
+                out.seek(offset)
+
+                for font, art, error in self.figlet.render_all_fonts(text, width=width, jobs=jobs, fonts=fonts):
+                    digest = None
+                    if error:
+                        MsgDCR.FailureMessage(f"Failed to render font '{font}': {error}")
+                    else:
+                        block = self.figlet.font_block(font, art).encode('utf-8')
+                        with PROFILER.stage('file io'):
+                            out.write(block)
+                            self._sync(out, durable)
+                        BYTES_WRITTEN.inc(len(block), target='file')
+                        offset += len(block)
+                        digest = hashlib.sha256(block).hexdigest()
+                    entries.append([font, offset, digest, error])
+                    with PROFILER.stage('file io'):
+                        journal.write(json.dumps(entries[-1]) + '\n')
+                        self._sync(journal, durable)
+                    written += 1
+                    if show_progress:
+                        print(f"\r{MsgDCR.INFO}Rendering fonts: {written}/{total}", end='', flush=True)
+            if show_progress:
+                print()
+            os.remove(self.journal_path)
+            self.entries = entries
+            MsgDCR.SuccessMessage(f"ASCII art saved successfully to: {self.path}")
+            return True
+        except Exception as e:
+            if show_progress:
+                print()
+            ERRORS.inc(kind='write')
+            MsgDCR.FailureMessage(f"Error writing to file: {e}")
+            return False
+
+    def _write_journal(self, lines: List, durable: bool) -> None:
+        """Replace the journal with `lines` in one step, so a kill never leaves it empty."""
+        with IO.replace_file(self.journal_path, sync=durable) as journal:
+            for line in lines:
+                journal.write(json.dumps(line) + '\n')
+
+    @staticmethod
+    def _sync(f, durable: bool) -> None:
+        f.flush()
+        if durable:
+            os.fsync(f.fileno())
@@ -13,6 +13,8 @@ SCRIPT_NAME = 'ChAsciiGen'
 
 SCRIPT_DESCRIPTION = 'Simple tool for text to ASCII Art generator'
 
+RENDER_ENGINES = ('pyfiglet', 'glyph')
+
 PROMPT = str(colorize(
     '%BoldRed', 'root',
     '%BoldWhite', '@',
@@ -27,10 +29,36 @@ class Config:
     DEFAULT_FONT: str = 'standard'
     CONFIG_FILE: str = 'config.json'
     OUTPUT_FILE: str = ''
+    FONT_CACHE_SIZE: int = 32
+    CACHE_DIR: str = ''
+    COMPILED_FONT_CACHE: bool = True
+    RENDER_ENGINE: str = 'pyfiglet'
+    PREFIX_CACHE_MAX_MB: int = 16
+    SERVER_HOST: str = '127.0.0.1'
+    SERVER_PORT: int = 8765
+    SERVER_WORKERS: int = 0
+    METRICS_DIR: str = ''
+    RENDER_CACHE: bool = False
+    RENDER_CACHE_MAX_MB: int = 32
+    DAEMON_IDLE_TIMEOUT: int = 900
+    ASYNC_CONCURRENCY: int = 0
 
 DEFAULT_CONFIG = {
     'max_width' : Config.MAX_WIDTH,
     'default_font' : Config.DEFAULT_FONT,
     'config_file' : Config.CONFIG_FILE,
-    'output_file' : Config.OUTPUT_FILE
+    'output_file' : Config.OUTPUT_FILE,
+    'font_cache_size' : Config.FONT_CACHE_SIZE,
+    'cache_dir' : Config.CACHE_DIR,
+    'compiled_font_cache' : Config.COMPILED_FONT_CACHE,
+    'render_engine' : Config.RENDER_ENGINE,
+    'prefix_cache_max_mb' : Config.PREFIX_CACHE_MAX_MB,
+    'server_host' : Config.SERVER_HOST,
+    'server_port' : Config.SERVER_PORT,
+    'server_workers' : Config.SERVER_WORKERS,
+    'metrics_dir' : Config.METRICS_DIR,
+    'render_cache' : Config.RENDER_CACHE,
+    'render_cache_max_mb' : Config.RENDER_CACHE_MAX_MB,
+    'daemon_idle_timeout' : Config.DAEMON_IDLE_TIMEOUT,
+    'async_concurrency' : Config.ASYNC_CONCURRENCY
 }
\ No newline at end of file
@@ -0,0 +1,260 @@
+# -*- coding: UTF-8 -*-
+# core/daemon.py
+
+from __future__ import annotations
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+from typing import List, Optional, Tuple
+
+from colorama import AnsiToWin32
+
+from cli.client import is_own_socket, request, socket_path
+from core.config import Config
+from core.ascii_art import Figlet
+from ui.decorators import MsgDCR
+
+
+class _Client:
+    """One connected CLI: output chunks are batched into newline-delimited JSON messages."""
+
+    BUFFER = 64 * 1024
+
+    def __init__(self, conn: socket.socket) -> None:
+        self.conn = conn
+        self.pending: List[Tuple[str, str]] = []
+        self.size = 0
+
+    def send(self, name: str, data: str) -> None:
+        # Consecutive writes to the same stream go out as one message, stdout and stderr stay in order
+        if self.pending and self.pending[-1][0] == name:
+            self.pending[-1] = (name, self.pending[-1][1] + data)
+        else:
+            self.pending.append((name, data))
+        self.size += len(data)
+        if self.size >= self.BUFFER:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            payload = b''.join(json.dumps({name: data}).encode('utf-8') + b'\n' for name, data in self.pending)
+            self.pending = []
+            self.size = 0
+            self.conn.sendall(payload)
+
+    def reply(self, message: dict) -> None:
+        self.flush()
+        self.conn.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+
+class _Channel:
+    """File-like stdout or stderr of a forwarded run."""
+
+    closed = False
+    encoding = 'utf-8'
+
+    def __init__(self, client: _Client, name: str, tty: bool) -> None:
+        self.client = client
+        self.name = name
+        self.tty = tty
+
+    def write(self, data: str) -> int:
+        if data:
+            self.client.send(self.name, data)
+        return len(data)
+
+    def flush(self) -> None:
+        self.client.flush()
+
+    def isatty(self) -> bool:
+        return self.tty
+
+    def fileno(self) -> int:
+        raise io.UnsupportedOperation('fileno')
+
+
+class RenderDaemon:
+    """
+    Long-lived process that keeps the fonts loaded and runs CLI invocations for the client.
+
+    `ChAsciiGen.py --daemon start` puts it in the background on a per-user Unix
+    socket (see cli/client.py); from then on every ChAsciiGen.py run sends
+    its arguments, working directory and terminal details over the socket
+    before importing pyfiglet, and the daemon runs the command in its warm
+    process and streams the output back. Only rendering one text, searching
+    and listing fonts are served; anything else is declined and runs
+    in-process as before. Requests are handled one at a time, since each
+    borrows the process-wide stdout, stderr and working directory, and
+    Config is reset to the daemon's settings before each one so options do
+    not leak between runs. The daemon exits after `idle_timeout` seconds
+    without a request.
+    """
+
+    REQUEST_TIMEOUT = 5.0
+    START_TIMEOUT = 15.0
+
+    def __init__(self, app, path: str = '', idle_timeout: Optional[int] = None) -> None:
+        self.app = app
+        self.path = path or socket_path()
+        self.idle_timeout = Config.DAEMON_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.settings = {name: value for name, value in vars(Config).items() if name.isupper()}
+        self.started = time.time()
+        self.stats = {'requests': 0, 'served': 0, 'declined': 0}
+        self._inode = None
+
+    @classmethod
+    def spawn(cls, path: str, idle_timeout: int) -> Optional[int]:
+        """Start a daemon in the background and return its pid once it answers, or None."""
+        script = os.path.abspath(sys.argv[0])
+        process = subprocess.Popen(
+            [sys.executable, script, '--daemon', 'run', '--socket', path, '--idle-timeout', str(idle_timeout)],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + cls.START_TIMEOUT
+        while time.monotonic() < deadline and process.poll() is None:
+            if request({'op': 'ping'}, path) is not None:
+                return process.pid
+            time.sleep(0.05)
+        return None
+
+    def run(self) -> int:
+        if not hasattr(socket, 'AF_UNIX'):
+            MsgDCR.FailureMessage('Unix sockets are not available on this platform.')
+            return 1
+        try:
+            server = self._bind()
+        except OSError as e:
+            MsgDCR.FailureMessage(f'Could not start daemon: {e}')
+            return 1
+
+        try:
+            # Pay for font discovery and the default font now rather than on the first request
+            Figlet.load_font(self.app.figlet.resolve_font(Config.DEFAULT_FONT))
+            timeout = f'{self.idle_timeout}s idle timeout' if self.idle_timeout else 'no idle timeout'
+            MsgDCR.InfoMessage(f'Daemon listening on {self.path} ({timeout})')
+            server.settimeout(self.idle_timeout or None)
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    MsgDCR.InfoMessage('No requests within the idle timeout, stopping.')
+                    break
+                with conn:
+                    if self.handle(conn):
+                        MsgDCR.InfoMessage('Daemon stopped.')
+                        break
+        except KeyboardInterrupt:
+            MsgDCR.InfoMessage('Daemon stopped.')
+        finally:
+            server.close()
+            self._unlink()
+        return 0
+
+    def _bind(self) -> socket.socket:
+        if os.path.lexists(self.path):
+            if request({'op': 'ping'}, self.path) is not None:
+                raise OSError(f'a daemon is already listening on {self.path}')
+            if not is_own_socket(self.path):
+                raise OSError(f'{self.path} exists and is not a socket of this user')
+            # Left behind by a daemon that was killed
+            os.remove(self.path)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the owner may connect: the socket runs commands as this user
+        umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        except OSError:
+            server.close()
+            raise
+        finally:
+            os.umask(umask)
+        server.listen(64)
+        self._inode = os.stat(self.path).st_ino
+        return server
+
+    def _unlink(self) -> None:
+        # A newer daemon may have replaced a socket that went stale, leave that one alone
+        try:
+            if os.stat(self.path).st_ino == self._inode:
+                os.remove(self.path)
+        except OSError:
+            pass
+
+    def handle(self, conn: socket.socket) -> bool:
+        """Serve one connection; returns True when the client asked the daemon to stop."""
+        client = _Client(conn)
+        try:
+            conn.settimeout(self.REQUEST_TIMEOUT)
+            with conn.makefile('r', encoding='utf-8') as reader:
+                message = json.loads(reader.readline() or 'null')
+            if not isinstance(message, dict):
+                return False
+
+            op = message.get('op')
+            if op == 'ping':
+                client.reply(self.status())
+            elif op == 'stop':
+                client.reply({'exit': 0, 'pid': os.getpid()})
+                return True
+            elif op == 'run':
+                conn.settimeout(None)
+                self.execute(client, message)
+        except (OSError, ValueError):
+            # The client went away or sent garbage, nothing to answer
+            pass
+        return False
+
+    def status(self) -> dict:
+        return dict(self.stats, exit=0, pid=os.getpid(), uptime=round(time.time() - self.started, 1),
+                    idle_timeout=self.idle_timeout)
+
+    def execute(self, client: _Client, message: dict) -> None:
+        self.stats['requests'] += 1
+        tty_out, tty_err = (list(message.get('tty') or []) + [False, False])[:2]
+        saved = sys.stdout, sys.stderr, os.getcwd()
+        for name, value in self.settings.items():
+            setattr(Config, name, value)
+
+        status = 1
+        try:
+            os.chdir(message.get('cwd') or saved[2])
+            # Same treatment colorama's init() gives a real stdout: codes stripped unless it is a terminal
+            sys.stdout = AnsiToWin32(_Channel(client, 'out', tty_out), convert=False, strip=not tty_out,
+                                     autoreset=True).stream
+            sys.stderr = AnsiToWin32(_Channel(client, 'err', tty_err), convert=False, strip=not tty_err,
+                                     autoreset=True).stream
+            self.app.load_config()
+            args = self.app.parser.build_parser([str(arg) for arg in message.get('argv') or []])
+            if not self.app.forwardable(args):
+                self.stats['declined'] += 1
+                client.reply({'fallback': True})
+                return
+            columns = message.get('columns')
+            if columns:
+                self.app.figlet._term_width = int(columns)
+            self.stats['served'] += 1
+            status = self.app.execute(args) or 0
+        except SystemExit as e:
+            # argparse usage errors, --help and --version
+            status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            status = 1
+            try:
+                print(f'{MsgDCR.FAIL}{e}', file=sys.stderr)
+            except Exception:
+                pass
+        finally:
+            sys.stdout, sys.stderr = saved[0], saved[1]
+            try:
+                os.chdir(saved[2])
+            except OSError:
+                pass
+        client.reply({'exit': status})
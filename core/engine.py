@@ -0,0 +1,456 @@
+# -*- coding: UTF-8 -*-
+# core/engine.py
+
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pyfiglet import CharNotPrinted, FigletFont
+
+from core.cache import LRUCache
+from core.config import Config
+
+
+# Smush rules, lifted from figlet222 (same values pyfiglet uses).
+SM_EQUAL = 1        # smush equal chars (not hardblanks)
+SM_LOWLINE = 2      # smush _ with any char in hierarchy
+SM_HIERARCHY = 4    # hierarchy: |, /\, [], {}, (), <>
+SM_PAIR = 8         # hierarchy: [ + ] -> |, { + } -> |, ( + ) -> |
+SM_BIGX = 16        # / + \ -> X, > + < -> X
+SM_HARDBLANK = 32   # hardblank + hardblank -> hardblank
+SM_KERN = 64
+SM_SMUSH = 128
+
+_MISSING = object()
+
+
+def smush_chars(smush_mode: int, hardblank: str, left: str, right: str, narrow: bool, rtl: bool) -> Optional[str]:
+    """The char `left` and `right` smush into under the smush rules of `smush_mode`, or None if they do not."""
+    if left == ' ':
+        return right
+    if right == ' ':
+        return left
+
+    # Disallows overlapping if previous or current char has a width of 1 or zero
+    if narrow:
+        return None
+
+    # kerning only
+    if (smush_mode & SM_SMUSH) == 0:
+        return None
+
+    # smushing by universal overlapping
+    if (smush_mode & 63) == 0:
+        if left == hardblank:
+            return right
+        if right == hardblank:
+            return left
+        return left if rtl else right
+
+    if smush_mode & SM_HARDBLANK:
+        if left == hardblank and right == hardblank:
+            return left
+
+    if left == hardblank or right == hardblank:
+        return None
+
+    if smush_mode & SM_EQUAL:
+        if left == right:
+            return left
+
+    smushes: Tuple[Tuple[str, str], ...] = ()
+    if smush_mode & SM_LOWLINE:
+        smushes += (('_', r'|/\[]{}()<>'),)
+    if smush_mode & SM_HIERARCHY:
+        smushes += (
+            ('|', r'/\[]{}()<>'),
+            (r'\/', '[]{}()<>'),
+            ('[]', '{}()<>'),
+            ('{}', '()<>'),
+            ('()', '<>'),
+        )
+    for a, b in smushes:
+        if left in a and right in b:
+            return right
+        if right in a and left in b:
+            return left
+
+    if smush_mode & SM_PAIR:
+        for pair in (left + right, right + left):
+            if pair in ('[]', '{}', '()'):
+                return '|'
+
+    if smush_mode & SM_BIGX:
+        if left == '/' and right == '\\':
+            return '|'
+        if right == '/' and left == '\\':
+            return 'Y'
+        if left == '>' and right == '<':
+            return 'X'
+    return None
+
+
+class GlyphFont:
+    """
+    Glyph table of one font with its edge profiles and smush results memoized.
+
+    For every glyph row the first non-blank column from the left and the last
+    non-blank column from the right are computed once, and every (left, right)
+    character pair that is smushed is remembered, so rendering never has to
+    strip or compare the same glyph edges twice.
+    """
+
+    def __init__(self, figlet_font: FigletFont) -> None:
+        self.name = figlet_font.font
+        self.height = figlet_font.height
+        self.hardblank = figlet_font.hardBlank
+        self.smush_mode = figlet_font.smushMode
+        self.print_direction = figlet_font.printDirection
+        self.chars = figlet_font.chars
+        self.widths = figlet_font.width
+        self.baseline = getattr(figlet_font, 'baseline', figlet_font.height)
+        self._lead: Dict[int, Tuple[Tuple[int, str], ...]] = {}
+        self._trail: Dict[int, Tuple[Tuple[int, str], ...]] = {}
+        self._smushed: Dict[Tuple[str, str, bool, bool], object] = {}
+
+    def lead(self, code: int) -> Tuple[Tuple[int, str], ...]:
+        """Per row (leading blanks, first visible char) of a glyph, as seen from the left."""
+        edges = self._lead.get(code)
+        if edges is None:
+            edges = tuple(self._lead_edge(row) for row in self.chars[code])
+            self._lead[code] = edges
+        return edges
+
+    def trail(self, code: int) -> Tuple[Tuple[int, str], ...]:
+        """Per row (index of last visible char, that char) of a glyph, as seen from the right."""
+        edges = self._trail.get(code)
+        if edges is None:
+            edges = tuple(self._trail_edge(row) for row in self.chars[code])
+            self._trail[code] = edges
+        return edges
+
+    @staticmethod
+    def _lead_edge(line: str) -> Tuple[int, str]:
+        # Only strip ascii space to match figlet exactly.
+        charbd = len(line) - len(line.lstrip(' '))
+        if charbd < len(line):
+            return charbd, line[charbd]
+        return len(line), ''
+
+    @staticmethod
+    def _trail_edge(line: str) -> Tuple[int, str]:
+        linebd = len(line.rstrip(' ')) - 1
+        if linebd < 0:
+            linebd = 0
+        if linebd < len(line):
+            return linebd, line[linebd]
+        return 0, ''
+
+    def smush(self, left: str, right: str, narrow: bool, rtl: bool) -> Optional[str]:
+        key = (left, right, narrow, rtl)
+        result = self._smushed.get(key, _MISSING)
+        if result is _MISSING:
+            result = smush_chars(self.smush_mode, self.hardblank, left, right, narrow, rtl)
+            self._smushed[key] = result
+        return result  # type: ignore
+
+
+class _State:
+    """Builder state at one point of a render, cheap to snapshot and restore."""
+
+    __slots__ = ('iterator', 'buffer', 'blanks', 'product', 'product_chars', 'prev_width', 'cur_width')
+
+    def __init__(self, iterator, buffer, blanks, product, product_chars, prev_width, cur_width) -> None:
+        self.iterator = iterator
+        self.buffer = buffer
+        self.blanks = blanks
+        self.product = product
+        self.product_chars = product_chars
+        self.prev_width = prev_width
+        self.cur_width = cur_width
+
+    def weight(self) -> int:
+        """
+        Rough upper bound of the bytes this snapshot keeps alive.
+
+        Counts the characters of its buffers and of the finished blocks even
+        though snapshots of the same render share most of them, so the
+        prefix cache errs on the side of holding less.
+        """
+        chars = sum(map(len, self.buffer)) + self.product_chars
+        strings = len(self.buffer)
+        for buffer, _ in self.blanks:
+            chars += sum(map(len, buffer))
+            strings += len(buffer)
+        return chars + 64 * strings + 256
+
+
+class GlyphEngine:
+    """
+    Native FIGlet renderer that reproduces `pyfiglet.figlet_format` byte for byte.
+
+    Glyph rows, edge profiles and smush results are memoized per font in
+    `GlyphFont` tables. On top of that the builder state is snapshotted right
+    after every blank, keyed by a hash of the text prefix, so a later render
+    sharing that prefix (e.g. banners differing only in a host name) resumes
+    from the snapshot instead of smushing the common part again. The
+    snapshots are bounded by their estimated size in bytes
+    (`prefix_capacity`, Config.PREFIX_CACHE_MAX_MB by default), and texts
+    longer than PREFIX_MAX_TEXT are not snapshotted at all: their prefixes
+    rarely repeat and the snapshots of one long line add up fast.
+    """
+
+    PREFIX_MAX_TEXT = 4096
+
+    def __init__(self, font_capacity: int = 0, prefix_capacity: int = 0) -> None:
+        self._fonts = LRUCache(font_capacity or Config.FONT_CACHE_SIZE)
+        self._prefixes = LRUCache(prefix_capacity or Config.PREFIX_CACHE_MAX_MB * 1024 * 1024,
+                                  weigh=_State.weight)
+
+    def glyph_font(self, figlet_font: FigletFont) -> GlyphFont:
+        # Keyed by identity as well as name so a reloaded font never reuses stale tables.
+        return self._fonts.get_or_create(
+            (figlet_font.font, id(figlet_font)),
+            lambda: GlyphFont(figlet_font)
+        )
+
+    def cache_info(self) -> Dict[str, Dict[str, int]]:
+        return {'fonts': self._fonts.info(), 'prefixes': self._prefixes.info()}
+
+    def clear(self) -> None:
+        self._fonts.clear()
+        self._prefixes.clear()
+
+    @staticmethod
+    def resolve_layout(figlet_font: FigletFont, direction: str = 'auto', justify: str = 'auto') -> Tuple[str, str]:
+        """Resolve 'auto' direction/justify the way pyfiglet.Figlet does."""
+        if direction == 'auto':
+            direction = 'right-to-left' if figlet_font.printDirection == 1 else 'left-to-right'
+        if justify == 'auto':
+            justify = 'right' if direction == 'right-to-left' else 'left'
+        return direction, justify
+
+    def render(self, figlet_font: FigletFont, text: str, width: int = 80,
+               direction: str = 'auto', justify: str = 'auto') -> str:
+        return ''.join(self.iter_blocks(figlet_font, text, width, direction, justify))
+
+    def iter_blocks(self, figlet_font: FigletFont, text: str, width: int = 80,
+                    direction: str = 'auto', justify: str = 'auto'):
+        """Render `text`, yielding each finished output line block as a string."""
+        direction, justify = self.resolve_layout(figlet_font, direction, justify)
+        glyphs = self.glyph_font(figlet_font)
+        builder = _Builder(glyphs, text, width, direction == 'right-to-left')
+
+        if len(text) > self.PREFIX_MAX_TEXT:
+            builder.run()
+        else:
+            key = (glyphs.name, id(figlet_font), width, direction)
+            digests = self._prefix_digests(text)
+            start = self._longest_prefix(key, digests)
+            if start is not None:
+                builder.restore(start)
+            builder.run(lambda state: self._prefixes.put((key, digests[state.iterator]), state))
+
+        for buffer in builder.blocks():
+            yield _format_block(buffer, glyphs, justify, width)
+
+    @staticmethod
+    def _prefix_digests(text: str) -> Dict[int, bytes]:
+        """Hash of every prefix of `text` ending in a blank, by prefix length, in one pass over the text."""
+        digests = {}
+        hasher = hashlib.blake2b(digest_size=16)
+        hashed = 0
+        position = text.find(' ')
+        while position >= 0:
+            hasher.update(text[hashed:position + 1].encode('utf-8', 'surrogatepass'))
+            hashed = position + 1
+            digests[hashed] = hasher.copy().digest()
+            position = text.find(' ', hashed)
+        return digests
+
+    def _longest_prefix(self, key: Tuple, digests: Dict[int, bytes]) -> Optional[_State]:
+        for digest in reversed(list(digests.values())):
+            state = self._prefixes.get((key, digest))
+            if state is not None:
+                return state
+        return None
+
+
+class _Builder:
+    """Port of pyfiglet's FigletBuilder working on precomputed glyph tables."""
+
+    def __init__(self, glyphs: GlyphFont, text: str, width: int, rtl: bool) -> None:
+        self.glyphs = glyphs
+        self.text = [ord(c) for c in text]
+        self.width = width
+        self.rtl = rtl
+        self.height = glyphs.height
+
+        self.iterator = 0
+        self.max_smush = 0
+        self.cur_width = 0
+        self.prev_width = 0
+        self.blanks: List[Tuple[Tuple[str, ...], int]] = []
+        # Finished blocks as a linked list of (parent, buffer) so snapshots share it.
+        self.product: Optional[Tuple] = None
+        self.product_chars = 0
+        self.buffer: List[str] = [''] * self.height
+
+    def snapshot(self) -> _State:
+        return _State(self.iterator, tuple(self.buffer), tuple(self.blanks),
+                      self.product, self.product_chars, self.prev_width, self.cur_width)
+
+    def restore(self, state: _State) -> None:
+        self.iterator = state.iterator
+        self.buffer = list(state.buffer)
+        self.blanks = list(state.blanks)
+        self.product = state.product
+        self.product_chars = state.product_chars
+        self.prev_width = state.prev_width
+        self.cur_width = state.cur_width
+
+    def run(self, on_word: Optional[Callable[[_State], None]] = None) -> None:
+        """Consume the text, calling `on_word` (if given) with a snapshot on first reaching each word start."""
+        text = self.text
+        total = len(text)
+        high_water = self.iterator if on_word is not None else total
+        while self.iterator < total:
+            # The state on first arriving at a position only depends on the text before it.
+            if self.iterator > high_water:
+                high_water = self.iterator
+                if text[self.iterator - 1] == 32:
+                    on_word(self.snapshot())
+            self.add_char()
+            self.iterator += 1
+
+        if self.buffer[0] != '':
+            self.add_product(self.buffer)
+
+    def add_product(self, buffer: List[str]) -> None:
+        self.product = (self.product, buffer)
+        self.product_chars += sum(map(len, buffer))
+
+    def blocks(self) -> List[List[str]]:
+        blocks = []
+        node = self.product
+        while node is not None:
+            node, buffer = node
+            blocks.append(buffer)
+        blocks.reverse()
+        return blocks
+
+    def add_char(self) -> None:
+        code = self.text[self.iterator]
+        glyphs = self.glyphs
+
+        # if the character is a newline, we flush the buffer
+        if code == 10:
+            self.blanks.append((tuple(self.buffer), self.iterator))
+            self.new_line()
+            return
+
+        cur_char = glyphs.chars.get(code)
+        if cur_char is None:
+            return
+        char_width = glyphs.widths[code]
+        if self.width < char_width:
+            raise CharNotPrinted("Width is not enough to print this character")
+        self.cur_width = char_width
+        self.max_smush = self.smush_amount(code)
+
+        total_width = len(self.buffer[0]) + char_width - self.max_smush
+
+        if code == 32:
+            self.blanks.append((tuple(self.buffer), self.iterator))
+
+        if total_width >= self.width:
+            self.new_line()
+        else:
+            self.add_glyph(code)
+
+        self.prev_width = self.cur_width
+
+    def new_line(self) -> None:
+        if self.blanks:
+            saved_buffer, saved_iterator = self.blanks.pop()
+            self.add_product(list(saved_buffer))
+            self.iterator = saved_iterator
+        else:
+            if self.prev_width == self.cur_width and not any(self.buffer):
+                # Retrying would reach this exact state again; pyfiglet loops forever here.
+                raise CharNotPrinted("Width is not enough to print this character")
+            self.add_product(self.buffer)
+            self.iterator -= 1
+        self.buffer = [''] * self.height
+        self.blanks = []
+        self.prev_width = 0
+
+    def smush_amount(self, code: int) -> int:
+        glyphs = self.glyphs
+        if (glyphs.smush_mode & (SM_SMUSH | SM_KERN)) == 0:
+            return 0
+
+        narrow = self.prev_width < 2 or self.cur_width < 2
+        rtl = self.rtl
+        max_smush = self.cur_width
+        edges = glyphs.trail(code) if rtl else glyphs.lead(code)
+        for row in range(self.height):
+            line = self.buffer[row]
+            if rtl:
+                # The glyph is on the left and the buffer on the right.
+                linebd, ch1 = edges[row]
+                left_len = len(glyphs.chars[code][row])
+                charbd, ch2 = GlyphFont._lead_edge(line)
+            else:
+                linebd, ch1 = GlyphFont._trail_edge(line)
+                left_len = len(line)
+                charbd, ch2 = edges[row]
+
+            amt = charbd + left_len - 1 - linebd
+
+            if ch1 == '' or ch1 == ' ':
+                amt += 1
+            elif ch2 != '' and glyphs.smush(ch1, ch2, narrow, rtl) is not None:
+                amt += 1
+
+            if amt < max_smush:
+                max_smush = amt
+
+        return max_smush
+
+    def add_glyph(self, code: int) -> None:
+        cur_char = self.glyphs.chars[code]
+        for row in range(self.height):
+            self.add_row(cur_char, row)
+
+    def add_row(self, cur_char: List[str], row: int) -> None:
+        add_left = self.buffer[row]
+        add_right = cur_char[row]
+        if self.rtl:
+            add_left, add_right = add_right, add_left
+
+        max_smush = self.max_smush
+        if max_smush:
+            glyphs = self.glyphs
+            narrow = self.prev_width < 2 or self.cur_width < 2
+            size = len(add_left)
+            chars = list(add_left)
+            for i in range(max_smush):
+                idx = size - max_smush + i
+                left = add_left[idx] if 0 <= idx < size else ''
+                smushed = glyphs.smush(left, add_right[i], narrow, self.rtl)
+                if idx >= 0:
+                    chars[idx] = smushed  # type: ignore
+            # A None here raises the same TypeError pyfiglet does on unsmushable rows.
+            add_left = ''.join(chars)
+
+        self.buffer[row] = add_left + add_right[max_smush:]
+
+
+def _format_block(buffer: List[str], glyphs: GlyphFont, justify: str, width: int) -> str:
+    if justify == 'right':
+        buffer = [(' ' * (width - len(row) - 1)) + row for row in buffer]
+    elif justify == 'center':
+        buffer = [(' ' * int((width - len(row)) / 2)) + row for row in buffer]
+    return ('\n'.join(buffer) + '\n').replace(glyphs.hardblank, ' ')
@@ -3,4 +3,8 @@
 
 class ChAsciiGenParserExit(Exception):
     """Custom Exception to simulate sys.exit without quitting CLI."""
-    pass
\ No newline at end of file
+    pass
+
+class ChAsciiGenFontError(Exception):
+    """Raised when a font name or number does not match any available font."""
+    pass
@@ -0,0 +1,187 @@
+# -*- coding: UTF-8 -*-
+# core/font_cache.py
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import zlib
+import marshal
+import pathlib
+import importlib.resources
+from typing import Dict, Iterable, Optional, Tuple
+
+import pyfiglet
+from pyfiglet import FigletFont, SHARED_DIRECTORY
+
+from core.io import IO
+from core.metrics import FONT_LOADS
+
+
+class CompiledFontCache:
+    """
+    Keeps parsed FIGlet fonts on disk in a compact marshal form.
+
+    Each font is stored as a zlib-compressed `<font>.bin` holding its header,
+    smush layout and glyph table, with all glyph rows joined into a single
+    string so loading is one decompress, one unmarshal and one split. An
+    entry is only used while the Python version, the pyfiglet version and
+    the mtime/size of the source font file still match, so upgrading
+    pyfiglet or editing a font silently invalidates it.
+    """
+
+    FORMAT_VERSION = 1
+    SUFFIX = '.bin'
+
+    def __init__(self, directory: str = '') -> None:
+        self.directory = directory or IO.cache_dir('fonts')
+
+    @staticmethod
+    def font_path(font: str) -> Optional[str]:
+        """Locate a font file the same way pyfiglet does, or None for non-filesystem fonts."""
+        for extension in ('tlf', 'flf'):
+            fn = f'{font}.{extension}'
+            path = importlib.resources.files('pyfiglet.fonts').joinpath(fn)
+            if path.exists():  # type: ignore
+                return str(path) if isinstance(path, pathlib.Path) else None
+            for location in ('./', SHARED_DIRECTORY):
+                full_name = os.path.join(location, fn)
+                if os.path.isfile(full_name):
+                    return full_name
+        return None
+
+    def _entry_path(self, font: str) -> str:
+        return os.path.join(self.directory, font + self.SUFFIX)
+
+    def _signature(self, source: str) -> Tuple:
+        st = os.stat(source)
+        return (
+            self.FORMAT_VERSION,
+            sys.version_info[:2],
+            pyfiglet.__version__,
+            st.st_mtime_ns,
+            st.st_size,
+        )
+
+    def load(self, font: str) -> Optional[FigletFont]:
+        """Return the compiled font if a valid entry exists, else None."""
+        source = self.font_path(font)
+        if source is None:
+            return None
+        try:
+            with open(self._entry_path(font), 'rb') as f:
+                entry = marshal.loads(zlib.decompress(f.read()))
+            signature, header, comment, codes, widths, rows = entry
+            if tuple(signature) != self._signature(source):
+                return None
+        except Exception:
+            return None
+        return self._build(font, header, comment, codes, widths, rows)
+
+    def store(self, figlet_font: FigletFont) -> bool:
+        source = self.font_path(figlet_font.font)
+        if source is None:
+            return False
+        header = (
+            figlet_font.height,
+            self._baseline(figlet_font),
+            figlet_font.hardBlank,
+            figlet_font.printDirection,
+            figlet_font.smushMode,
+        )
+        codes = tuple(figlet_font.chars)
+        entry = (
+            self._signature(source),
+            header,
+            figlet_font.comment,
+            codes,
+            tuple(figlet_font.width[code] for code in codes),
+            '\n'.join(row for code in codes for row in figlet_font.chars[code]),
+        )
+        try:
+            # Written through a temporary file so readers never see a half written entry.
+            with IO.replace_file(self._entry_path(figlet_font.font), 'wb') as f:
+                f.write(zlib.compress(marshal.dumps(entry), 1))
+            return True
+        except Exception:
+            return False
+
+    def get(self, font: str) -> FigletFont:
+        """Load `font` from the cache, parsing and storing it on a miss."""
+        compiled = self.load(font)
+        if compiled is not None:
+            FONT_LOADS.inc(source='compiled')
+            return compiled
+        FONT_LOADS.inc(source='parsed')
+        figlet_font = FigletFont(font)
+        figlet_font.baseline = self._baseline(figlet_font)
+        self.store(figlet_font)
+        return figlet_font
+
+    def clear(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def rebuild(self, fonts: Iterable[str]) -> Dict[str, float]:
+        """
+        Recompile every font and measure cold parse time against cache load time.
+
+        Returns a dict with the number of fonts compiled and the total seconds
+        spent parsing the .flf files and loading the compiled entries.
+        """
+        self.clear()
+        compiled = []
+        parse_time = 0.0
+        for font in fonts:
+            start = time.perf_counter()
+            try:
+                figlet_font = FigletFont(font)
+            except Exception:
+                continue
+            parse_time += time.perf_counter() - start
+            if self.store(figlet_font):
+                compiled.append(font)
+
+        load_time = 0.0
+        for font in compiled:
+            start = time.perf_counter()
+            self.load(font)
+            load_time += time.perf_counter() - start
+
+        return {
+            'fonts': len(compiled),
+            'parse_time': parse_time,
+            'load_time': load_time,
+        }
+
+    @staticmethod
+    def _baseline(figlet_font: FigletFont) -> int:
+        try:
+            header = FigletFont.reMagicNumber.sub('', figlet_font.data.split('\n', 1)[0]).split()
+            return int(header[2])
+        except Exception:
+            return figlet_font.height
+
+    @staticmethod
+    def _build(font: str, header: Tuple, comment: str, codes: Tuple, widths: Tuple, rows: str) -> FigletFont:
+        # Bypass FigletFont.__init__, which would read and parse the font file again.
+        figlet_font = FigletFont.__new__(FigletFont)
+        (figlet_font.height, figlet_font.baseline, figlet_font.hardBlank,
+         figlet_font.printDirection, figlet_font.smushMode) = header
+        height = figlet_font.height
+        lines = rows.split('\n')
+        figlet_font.font = font
+        figlet_font.data = ''
+        figlet_font.comment = comment
+        figlet_font.chars = {
+            code: lines[i * height:(i + 1) * height] for i, code in enumerate(codes)
+        }
+        figlet_font.width = dict(zip(codes, widths))
+        return figlet_font
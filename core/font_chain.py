@@ -0,0 +1,111 @@
+# -*- coding: UTF-8 -*-
+# core/font_chain.py
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.font_fit import GlyphMetrics
+from core.font_index import FontIndex
+
+
+class FontChain:
+    """
+    Fonts tried in order for every character of a text ("slant,standard,term").
+
+    A character is drawn with the first font whose coverage bitmap in the
+    FontIndex has a visible glyph for it; a space stays with the font of the
+    character before it so runs are not split needlessly. The bitmaps are
+    unpacked once per chain into strings of '0'/'1' indexed by character
+    code, so every lookup is O(1) however long the text is.
+    """
+
+    def __init__(self, fonts: Sequence[str], index: Optional[FontIndex] = None,
+                 metrics: Optional[GlyphMetrics] = None) -> None:
+        self.fonts = list(fonts)
+        self.index = index or FontIndex.shared()
+        self.metrics = metrics or GlyphMetrics.shared()
+        self._bits: List[str] = []
+        for font in self.fonts:
+            info = self.index.get(font)
+            self._bits.append(bin(info.coverage)[:1:-1] if info is not None else '')
+        self._chosen: Dict[str, Optional[str]] = {}
+
+    def covers(self, font_number: int, code: int) -> bool:
+        bits = self._bits[font_number]
+        return code < len(bits) and bits[code] == '1'
+
+    def font_for(self, ch: str) -> Optional[str]:
+        """The first font of the chain that draws `ch`, or None when none does."""
+        font = self._chosen.get(ch, '')
+        if font == '':
+            code = ord(ch)
+            font = next((f for i, f in enumerate(self.fonts) if self.covers(i, code)), None)
+            self._chosen[ch] = font
+        return font
+
+    def runs(self, line: str) -> List[Tuple[str, str]]:
+        """Split `line` into (font, text) runs of consecutive characters drawn with the same font."""
+        runs: List[Tuple[str, str]] = []
+        font: Optional[str] = None
+        start = 0
+        for i, ch in enumerate(line):
+            if ch == ' ' and font is not None:
+                continue
+            chosen = self.font_for(ch)
+            if chosen != font:
+                if font is not None and i > start:
+                    runs.append((font, line[start:i]))
+                font, start = chosen, i
+        if font is not None and start < len(line):
+            runs.append((font, line[start:]))
+        return runs
+
+    def estimate(self, text: str) -> int:
+        """Estimated width of `text` drawn through the chain; never narrower than the render for plain text."""
+        total = 0
+        for font, run in self.runs(text):
+            metrics = self.metrics.get(font)
+            info = self.index.get(font)
+            if metrics is not None:
+                total += metrics.line_width(run)
+            if info is not None:
+                # The glyph metrics stop at code 255, count anything above at the widest glyph
+                total += info.max_width * sum(1 for ch in run if ord(ch) > GlyphMetrics.MAX_CODE)
+        return total
+
+    def wrap(self, line: str, width: int) -> List[str]:
+        """
+        Break `line` into pieces that each render narrower than `width`, at spaces where possible.
+
+        Words are packed greedily on estimated widths the way pyfiglet wraps a
+        single font; a word too wide on its own is split between characters.
+        """
+        pieces: List[str] = []
+        current = ''
+        used = 0
+        for word in line.split(' '):
+            word_width = self.estimate(word)
+            if current:
+                gap = self.estimate(' ' + word)
+                if used + gap < width:
+                    current += ' ' + word
+                    used += gap
+                    continue
+                pieces.append(current)
+            current, used = word, word_width
+            while used >= width and len(current) > 1:
+                split = self._split_point(current, width)
+                pieces.append(current[:split])
+                current = current[split:]
+                used = self.estimate(current)
+        pieces.append(current)
+        return pieces
+
+    def _split_point(self, word: str, width: int) -> int:
+        used = 0
+        for i, ch in enumerate(word):
+            used += self.estimate(ch)
+            if used >= width:
+                return max(1, i)
+        return len(word)
@@ -0,0 +1,211 @@
+# -*- coding: UTF-8 -*-
+# core/font_fit.py
+
+from __future__ import annotations
+
+import sys
+import zlib
+import marshal
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pyfiglet import FigletFont
+
+from core.engine import SM_KERN, SM_SMUSH, smush_chars
+from core.font_cache import CompiledFontCache
+from core.font_index import FontIndex
+from core.io import IO
+from core.registry import FontRegistry
+
+# (width, leading blanks per row, first visible char per row, trailing blanks per row,
+#  last visible char per row); a blank row has the full width as blank count and ' ' as char
+Glyph = Tuple[int, Tuple[int, ...], str, Tuple[int, ...], str]
+
+
+class FontMetrics(NamedTuple):
+    height: int
+    smush_mode: int
+    hardblank: str
+    glyphs: Dict[int, Glyph]
+
+    def line_width(self, line: str) -> int:
+        """
+        Estimate the rendered width of one unwrapped line.
+
+        Applies pyfiglet's overlap rule to the glyph edge profiles: a glyph
+        overlaps the line so far by the smallest per-row sum of trailing and
+        leading blanks, plus one where the two edge characters smush. The line
+        is tracked by the trailing blanks and last visible char of each row,
+        so the estimate only misses where a smush changes an edge character.
+        """
+        glyphs = self.glyphs
+        kerns = self.smush_mode & (SM_SMUSH | SM_KERN)
+        smushed: Dict[Tuple[str, str, bool], bool] = {}
+        total = 0
+        prev_width = 0
+        trail: List[int] = []
+        trail_chars = ''
+        for ch in line:
+            glyph = glyphs.get(ord(ch))
+            if glyph is None:
+                continue
+            width, lead, lead_chars, glyph_trail, glyph_trail_chars = glyph
+            overlap = 0
+            if trail and kerns:
+                narrow = prev_width < 2 or width < 2
+                overlap = width
+                for t, left, l, right in zip(trail, trail_chars, lead, lead_chars):
+                    amount = t + l
+                    if left != ' ' and right != ' ':
+                        key = (left, right, narrow)
+                        if key not in smushed:
+                            smushed[key] = smush_chars(self.smush_mode, self.hardblank, left, right, narrow, False) is not None
+                        amount += smushed[key]
+                    if amount < overlap:
+                        overlap = amount
+            total += width - overlap
+            trail = [t if t < width else buffered + width - overlap
+                     for t, buffered in zip(glyph_trail, trail or glyph_trail)]
+            trail_chars = ''.join(c if c != ' ' else buffered
+                                  for c, buffered in zip(glyph_trail_chars, trail_chars or glyph_trail_chars))
+            prev_width = width
+        return total
+
+    def ink_height(self, text: str) -> int:
+        """Number of rows that draw anything for the characters of `text`, the visible size of the font."""
+        inked = [False] * self.height
+        for code in {ord(ch) for ch in text}:
+            glyph = self.glyphs.get(code)
+            if glyph is not None:
+                inked = [row or ch != ' ' for row, ch in zip(inked, glyph[2])]
+        return sum(inked)
+
+
+class GlyphMetrics:
+    """
+    Glyph widths and edge profiles of every installed font, for width estimates without rendering.
+
+    For every glyph up to code 255 the width and the leading and trailing
+    blank count and edge character of each row are recorded. Like the
+    FontIndex, the table is computed once per font install and kept in the
+    cache directory under the registry signature, as a zlib-compressed marshal
+    file (`glyph_metrics.bin`) like the compiled fonts since it is read on
+    every fit.
+    """
+
+    FORMAT_VERSION = 1
+    MAX_CODE = 255
+    _shared: Optional[GlyphMetrics] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, registry: Optional[FontRegistry] = None, path: str = '') -> None:
+        self.registry = registry or FontRegistry.shared()
+        self._path = path
+        self._entries: Optional[Dict[str, FontMetrics]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> GlyphMetrics:
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @property
+    def path(self) -> str:
+        return self._path or IO.cache_dir('glyph_metrics.bin')
+
+    @property
+    def entries(self) -> Dict[str, FontMetrics]:
+        if self._entries is None:
+            self._load()
+        return self._entries
+
+    def get(self, font: str) -> Optional[FontMetrics]:
+        return self.entries.get(font)
+
+    def estimate_width(self, font: str, text: str) -> Optional[int]:
+        """Estimated width of `text` in `font` without wrapping (widest line), or None for an unknown font."""
+        metrics = self.entries.get(font)
+        if metrics is None:
+            return None
+        return max(metrics.line_width(line) for line in text.split('\n'))
+
+    def rank(self, text: str, width: int) -> List[Tuple[str, int]]:
+        """
+        Return (font, estimated width) of every font that should fit in `width` columns, biggest first.
+
+        Fonts are ordered by the area the text covers: the estimated width
+        times the number of rows it inks (the font height less blank rows).
+        Fonts without a visible glyph for every character of `text` are left
+        out, they would silently drop those characters.
+        """
+        index = FontIndex.shared()
+        codes = {ord(ch) for ch in text if ch not in ' \n'}
+        candidates = []
+        for font, metrics in self.entries.items():
+            info = index.get(font)
+            if info is None or not info.covers(codes):
+                continue
+            estimate = self.estimate_width(font, text)
+            if estimate and estimate <= width:
+                ink_height = metrics.ink_height(text)
+                candidates.append((ink_height * estimate, ink_height, estimate, font))
+        candidates.sort(key=lambda c: (-c[0], -c[1], c[3]))
+        return [(font, estimate) for _, _, estimate, font in candidates]
+
+    def _signature(self) -> Optional[List]:
+        signature = self.registry.signature()
+        return None if signature is None else [self.FORMAT_VERSION, sys.version_info[:2]] + signature
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._entries is not None:
+                return
+            signature = self._signature()
+            if signature is not None:
+                try:
+                    with open(self.path, 'rb') as f:
+                        saved, data = marshal.loads(zlib.decompress(f.read()))
+                    if saved == signature:
+                        self._entries = {font: FontMetrics(*values) for font, values in data.items()}
+                        return
+                except Exception:
+                    pass
+            self._entries = self._build()
+            if signature is not None:
+                self._save(signature)
+
+    def _save(self, signature: List) -> bool:
+        data = {font: tuple(metrics) for font, metrics in self._entries.items()}
+        try:
+            # Written through a temporary file so readers never see a half written table.
+            with IO.replace_file(self.path, 'wb') as f:
+                f.write(zlib.compress(marshal.dumps((signature, data)), 1))
+            return True
+        except Exception:
+            return False
+
+    def _build(self) -> Dict[str, FontMetrics]:
+        cache = CompiledFontCache()
+        entries = {}
+        for font in self.registry.fonts:
+            try:
+                entries[font] = self.describe(cache.get(font))
+            except Exception:
+                continue
+        return entries
+
+    @classmethod
+    def describe(cls, figlet_font: FigletFont) -> FontMetrics:
+        glyphs = {}
+        for code, rows in figlet_font.chars.items():
+            if code > cls.MAX_CODE:
+                continue
+            lead = tuple(len(row) - len(row.lstrip(' ')) for row in rows)
+            lead_chars = ''.join((row.lstrip(' ') or ' ')[0] for row in rows)
+            trail = tuple(len(row) - len(row.rstrip(' ')) for row in rows)
+            trail_chars = ''.join((row.rstrip(' ') or ' ')[-1] for row in rows)
+            glyphs[code] = (figlet_font.width[code], lead, lead_chars, trail, trail_chars)
+        return FontMetrics(figlet_font.height, figlet_font.smushMode, figlet_font.hardBlank, glyphs)
@@ -0,0 +1,190 @@
+# -*- coding: UTF-8 -*-
+# core/font_index.py
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from pyfiglet import FigletFont
+
+from core.font_cache import CompiledFontCache
+from core.io import IO
+from core.registry import FontRegistry
+
+
+class FontInfo(NamedTuple):
+    height: int
+    baseline: int
+    avg_width: float
+    max_width: int
+    coverage: int       # bitmap, bit n set when character code n has a visible glyph
+    smush: int          # FIGlet smush layout bits
+    direction: int      # 0 = left-to-right, 1 = right-to-left
+    file_size: int
+
+    def covers(self, codes: Set[int]) -> bool:
+        return all(self.coverage >> code & 1 for code in codes)
+
+
+def parse_charset(spec: str) -> Set[int]:
+    """
+    Turn a character set like "0-9:" or "A-Za-z!" into character codes.
+
+    `a-b` is an inclusive range, a leading or trailing "-" is taken literally.
+    """
+    codes = set()
+    i = 0
+    while i < len(spec):
+        if i + 2 < len(spec) and spec[i + 1] == '-':
+            first, last = ord(spec[i]), ord(spec[i + 2])
+            if first > last:
+                raise ValueError(f"Invalid range '{spec[i:i + 3]}'")
+            codes.update(range(first, last + 1))
+            i += 3
+        else:
+            codes.add(ord(spec[i]))
+            i += 1
+    return codes
+
+
+class FontIndex:
+    """
+    Per-font metadata for every installed font, computed once per font install.
+
+    Building the index loads each font through the compiled font cache and
+    records its height, baseline, glyph widths, character coverage, smush
+    layout and file size. The result is persisted as `font_index.json` in the
+    cache directory under the same signature as the font registry, so property
+    queries are answered without loading or rendering any font.
+    """
+
+    FORMAT_VERSION = 2
+    _shared: Optional[FontIndex] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, registry: Optional[FontRegistry] = None, path: str = '') -> None:
+        self.registry = registry or FontRegistry.shared()
+        self._path = path
+        self._entries: Optional[Dict[str, FontInfo]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> FontIndex:
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @property
+    def path(self) -> str:
+        return self._path or IO.cache_dir('font_index.json')
+
+    @property
+    def entries(self) -> Dict[str, FontInfo]:
+        if self._entries is None:
+            self._load()
+        return self._entries
+
+    def get(self, font: str) -> Optional[FontInfo]:
+        return self.entries.get(font)
+
+    def query(self, keyword: str = '', max_height: int = 0, min_height: int = 0,
+              max_width: int = 0, covers: str = '') -> List[str]:
+        """Return the fonts, in registry order, matching every given filter; 0 or '' means no filter."""
+        keyword = keyword.lower()
+        codes = parse_charset(covers) if covers else set()
+        entries = self.entries
+        matches = []
+        for font in self.registry.fonts:
+            if keyword and keyword not in font.lower():
+                continue
+            info = entries.get(font)
+            if info is None:
+                continue
+            if max_height and info.height > max_height:
+                continue
+            if min_height and info.height < min_height:
+                continue
+            if max_width and info.max_width > max_width:
+                continue
+            if codes and not info.covers(codes):
+                continue
+            matches.append(font)
+        return matches
+
+    def _signature(self) -> Optional[List]:
+        signature = self.registry.signature()
+        return None if signature is None else [self.FORMAT_VERSION] + signature
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._entries is not None:
+                return
+            signature = self._signature()
+            data = IO.load_signed_json(self.path, signature) if signature is not None else None
+            if isinstance(data, dict):
+                self._entries = {font: self._decode(values) for font, values in data.items()}
+                return
+            self._entries = self._build()
+            self._save(signature)
+
+    def rebuild(self) -> Dict[str, FontInfo]:
+        """Recompute the metadata of every font and persist it."""
+        with self._lock:
+            self._entries = self._build()
+            self._save(self._signature())
+        return self._entries
+
+    def _save(self, signature: Optional[List]) -> None:
+        if signature is not None:
+            IO.save_signed_json(self.path, signature, {font: self._encode(info) for font, info in self._entries.items()})
+
+    @staticmethod
+    def _encode(info: FontInfo) -> list:
+        # Coverage reaches bit 65535 for some fonts, hex keeps that compact and clear of int/str limits.
+        return list(info._replace(coverage=format(info.coverage, 'x')))
+
+    @staticmethod
+    def _decode(values: list) -> FontInfo:
+        info = FontInfo(*values)
+        return info._replace(coverage=int(info.coverage, 16))
+
+    def _build(self) -> Dict[str, FontInfo]:
+        cache = CompiledFontCache()
+        entries = {}
+        for font in self.registry.fonts:
+            try:
+                figlet_font = cache.get(font)
+            except Exception:
+                continue
+            entries[font] = self.describe(figlet_font, cache.font_path(font))
+        return entries
+
+    @staticmethod
+    def describe(figlet_font: FigletFont, path: Optional[str] = None) -> FontInfo:
+        blank = {' ', figlet_font.hardBlank}
+        coverage = 0
+        widths = []
+        for code, rows in figlet_font.chars.items():
+            width = figlet_font.width[code]
+            widths.append(width)
+            # A space glyph draws nothing by design, so having one is enough to cover it
+            if code == 32 or any(ch not in blank for row in rows for ch in row):
+                coverage |= 1 << code
+        try:
+            file_size = os.path.getsize(path) if path else 0
+        except OSError:
+            file_size = 0
+        return FontInfo(
+            height=figlet_font.height,
+            baseline=getattr(figlet_font, 'baseline', figlet_font.height),
+            avg_width=round(sum(widths) / len(widths), 2) if widths else 0.0,
+            max_width=max(widths, default=0),
+            coverage=coverage,
+            smush=figlet_font.smushMode,
+            direction=figlet_font.printDirection,
+            file_size=file_size,
+        )
@@ -0,0 +1,122 @@
+# -*- coding: UTF-8 -*-
+# core/font_search.py
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of `text` padded with one marker on each side, so short words and word edges count."""
+    padded = f'\0{text}\0'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def subsequence_positions(keyword: str, text: str) -> Optional[List[int]]:
+    """Positions of the characters of `keyword` found in order in `text`, or None if they are not all there."""
+    positions = []
+    start = 0
+    for ch in keyword:
+        i = text.find(ch, start)
+        if i < 0:
+            return None
+        positions.append(i)
+        start = i + 1
+    return positions
+
+
+def typo_distance(keyword: str, text: str, bound: int) -> Optional[int]:
+    """
+    Fewest typos that turn `keyword` into some part of `text`, or None if more than `bound`.
+
+    A typo is a missing, extra or wrong character or two swapped neighbours
+    (optimal string alignment distance), and the match may start and end
+    anywhere in `text`.
+    """
+    size = len(keyword)
+    before: List[int] = []
+    previous = list(range(size + 1))
+    best = previous[size]
+    for j, ch in enumerate(text):
+        current = [0] * (size + 1)
+        for i in range(1, size + 1):
+            distance = min(previous[i] + 1, current[i - 1] + 1, previous[i - 1] + (keyword[i - 1] != ch))
+            if i > 1 and j > 0 and keyword[i - 1] == text[j - 1] and keyword[i - 2] == ch:
+                distance = min(distance, before[i - 2] + 1)
+            current[i] = distance
+        best = min(best, current[size])
+        before, previous = previous, current
+    return best if best <= bound else None
+
+
+class FontNameIndex:
+    """
+    Trigram index over font names for ranked, typo-tolerant search.
+
+    Results are ranked exact match first, then names containing the keyword
+    (shorter and earlier matches first), then fuzzy matches ordered by trigram
+    similarity, with a boost when the keyword's letters appear in order in the
+    name, so "slnt" still finds "slant", and a smaller one per typo when the
+    name holds the keyword with a few typos, so "slnat" does too. Only names
+    sharing at least one trigram with the keyword are ever scored.
+    """
+
+    MIN_SIMILARITY = 0.2
+    # One typo is tolerated per this many keyword characters, none in shorter keywords
+    CHARS_PER_TYPO = 5
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.names = list(names)
+        self._lower = [name.lower() for name in self.names]
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(self._lower):
+            for gram in trigrams(name):
+                self._postings[gram].append(i)
+        self._sizes = [len(trigrams(name)) for name in self._lower]
+
+    def search(self, keyword: str, limit: int = 0) -> List[str]:
+        return [name for name, _ in self.ranked(keyword, limit)]
+
+    def ranked(self, keyword: str, limit: int = 0) -> List[Tuple[str, float]]:
+        keyword = keyword.lower()
+        if not keyword:
+            return [(name, 0.0) for name in self.names[:limit or None]]
+
+        scores: Dict[int, float] = {}
+        if len(keyword) < 3:
+            # Too short for trigrams to help, a scan of the lower-cased names is cheap enough.
+            for i, name in enumerate(self._lower):
+                if keyword in name:
+                    scores[i] = self._substring_score(keyword, name)
+        else:
+            query = trigrams(keyword)
+            max_typos = len(keyword) // self.CHARS_PER_TYPO
+            shared: Dict[int, int] = defaultdict(int)
+            for gram in query:
+                for i in self._postings.get(gram, ()):
+                    shared[i] += 1
+            for i, count in shared.items():
+                name = self._lower[i]
+                if keyword in name:
+                    scores[i] = self._substring_score(keyword, name)
+                    continue
+                similarity = count / (len(query) + self._sizes[i] - count)
+                if subsequence_positions(keyword, name) is not None:
+                    similarity += 0.5
+                elif max_typos:
+                    typos = typo_distance(keyword, name, max_typos)
+                    if typos is not None:
+                        similarity += 0.5 / (1 + typos)
+                if similarity >= self.MIN_SIMILARITY:
+                    scores[i] = similarity
+
+        order = sorted(scores, key=lambda i: (-scores[i], len(self._lower[i]), i))
+        if limit:
+            order = order[:limit]
+        return [(self.names[i], scores[i]) for i in order]
+
+    @staticmethod
+    def _substring_score(keyword: str, name: str) -> float:
+        if keyword == name:
+            return 4.0
+        # Between 2 and 3.25: a longer share of the name wins, a match at the start gets a small lift
+        return 2.0 + len(keyword) / len(name) + (0.25 if name.startswith(keyword) else 0.0)
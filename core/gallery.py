@@ -0,0 +1,169 @@
+# -*- coding: UTF-8 -*-
+# core/gallery.py
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import hashlib
+from typing import Dict, List, Optional
+
+import pyfiglet
+
+from core.ascii_art import Figlet
+from core.config import Config
+from core.font_cache import CompiledFontCache
+from core.io import IO
+from core.metrics import BYTES_WRITTEN, ERRORS
+from core.profiler import PROFILER
+from ui.decorators import MsgDCR
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class FontGallery:
+    """
+    All-fonts output of one text that is brought up to date instead of regenerated.
+
+    A manifest next to the output file (`<output>.manifest.json`) records per
+    font a hash of the inputs of its block (font name, font file hash, text,
+    width and pyfiglet version) and the hash, byte offset and length of the
+    block written. On the next build a font whose inputs are unchanged has its
+    block copied from the previous output, after checking the block hash, and
+    only the other fonts are rendered. Output and manifest are replaced
+    atomically, so an interrupted build leaves the previous gallery intact.
+    """
+
+    FORMAT_VERSION = 1
+    MANIFEST_SUFFIX = '.manifest.json'
+
+    def __init__(self, figlet: Figlet, path: str = '') -> None:
+        self.figlet = figlet
+        self.path = path or Config.OUTPUT_FILE
+        self.manifest_path = os.path.realpath(self.path) + self.MANIFEST_SUFFIX
+
+    def load_manifest(self) -> Dict[str, dict]:
+        manifest = IO.load_signed_json(self.manifest_path, [self.FORMAT_VERSION])
+        return manifest if isinstance(manifest, dict) else {}
+
+    @staticmethod
+    def file_signature(font: str, previous: Optional[list] = None) -> list:
+        """
+        Return [mtime_ns, size, sha256] of the font file.
+
+        The file is only hashed again when its mtime or size differ from
+        `previous`. Fonts that are not plain files get an empty signature and
+        are covered by the pyfiglet version alone.
+        """
+        path = CompiledFontCache.font_path(font)
+        if path is None:
+            return [0, 0, '']
+        try:
+            st = os.stat(path)
+            if previous and previous[:2] == [st.st_mtime_ns, st.st_size]:
+                return previous
+            with open(path, 'rb') as f:
+                return [st.st_mtime_ns, st.st_size, _sha256(f.read())]
+        except OSError:
+            return [0, 0, '']
+
+    @staticmethod
+    def input_key(font: str, file_hash: str, text: str, width: int) -> str:
+        return _sha256(json.dumps([font, file_hash, text, width, pyfiglet.__version__]).encode('utf-8'))
+
+    def build(self, text: str, width: int = 80, jobs: int = 1) -> Optional[Dict[str, int]]:
+        """
+        Bring the gallery at `self.path` up to date for `text` and `width`.
+
+        Returns counts of the fonts 'rendered', 'reused' from the previous
+        output and 'failed', or None when the output could not be written.
+        """
+        fonts = self.figlet._fonts
+        previous = self.load_manifest()
+        manifest: Dict[str, dict] = {}
+        stale: List[str] = []
+        for font in fonts:
+            entry = previous.get(font) or {}
+            file_signature = self.file_signature(font, entry.get('file'))
+            key = self.input_key(font, file_signature[2], text, width)
+            manifest[font] = {'key': key, 'file': file_signature}
+            if entry.get('key') != key:
+                stale.append(font)
+
+        stats = {'rendered': 0, 'reused': 0, 'failed': 0}
+        rendered = self.figlet.render_all_fonts(text, width=width, jobs=jobs, fonts=stale)
+        stale_fonts = set(stale)
+        show_progress = sys.stdout.isatty()
+        try:
+            # The old output is read for unchanged blocks while the new one is written next to it
+            with self._open_previous() as old, IO.replace_file(self.path, 'wb') as out:
+                offset = 0
+                for number, font in enumerate(fonts, 1):
+                    entry = manifest[font]
+                    block = None
+                    error = None
+                    if font in stale_fonts:
+                        _, art, error = next(rendered)
+                    else:
+                        block = self._carry(old, previous[font])
+                        if block is None and previous[font].get('error'):
+                            error = previous[font]['error']
+                        elif block is None:
+                            # The old block is missing or was edited, render it again
+                            _, art, error = next(self.figlet.render_all_fonts(text, width=width, fonts=[font]))
+                        else:
+                            stats['reused'] += 1
+
+                    if error:
+                        MsgDCR.FailureMessage(f"Failed to render font '{font}': {error}")
+                        entry['error'] = error
+                        stats['failed'] += 1
+                        continue
+                    if block is None:
+                        block = self.figlet.font_block(font, art).encode('utf-8')
+                        stats['rendered'] += 1
+
+                    with PROFILER.stage('file io'):
+                        out.write(block)
+                    entry.update(hash=_sha256(block), offset=offset, length=len(block))
+                    offset += len(block)
+                    if show_progress:
+                        print(f"\r{MsgDCR.INFO}Updating gallery: {number}/{len(fonts)}", end='', flush=True)
+            if show_progress:
+                print()
+        except Exception as e:
+            if show_progress:
+                print()
+            ERRORS.inc(kind='write')
+            MsgDCR.FailureMessage(f"Error writing to file: {e}")
+            return None
+
+        BYTES_WRITTEN.inc(offset, target='file')
+        IO.save_signed_json(self.manifest_path, [self.FORMAT_VERSION], manifest)
+        MsgDCR.SuccessMessage(
+            f"Gallery saved to: {self.path} "
+            f"({stats['rendered']} rendered, {stats['reused']} unchanged, {stats['failed']} failed)"
+        )
+        return stats
+
+    def _open_previous(self):
+        try:
+            return open(self.path, 'rb')
+        except OSError:
+            return open(os.devnull, 'rb')
+
+    @staticmethod
+    def _carry(old, entry: dict) -> Optional[bytes]:
+        """Read a block of the previous output, or None if it is gone or no longer matches its hash."""
+        if 'hash' not in entry:
+            return None
+        try:
+            with PROFILER.stage('file io'):
+                old.seek(entry['offset'])
+                block = old.read(entry['length'])
+        except (OSError, ValueError, TypeError):
+            return None
+        return block if _sha256(block) == entry['hash'] else None
@@ -3,12 +3,60 @@
 
 
 import os
+import sys
 import json
+import tempfile
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterable, Iterator, List, TextIO, Union
 
 from core.config import Config, DEFAULT_CONFIG
+from core.metrics import BYTES_WRITTEN, ERRORS, METRICS
+from core.profiler import PROFILER
 from ui.decorators import MsgDCR
 
 class IO:
+    @staticmethod
+    def cache_dir(*parts: str) -> str:
+        """Return the per-user cache directory (or Config.CACHE_DIR when set), joined with `parts`."""
+        if Config.CACHE_DIR:
+            base = Config.CACHE_DIR
+        elif os.name == 'nt':
+            base = os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser('~'), 'ChAsciiGen', 'Cache')
+        else:
+            base = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'chasciigen')
+        return os.path.join(base, *parts)
+
+    @staticmethod
+    def load_signed_json(path: str, signature: Any) -> Any:
+        """Return the data saved by save_signed_json, or None if it is missing, corrupt or stale."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(saved, dict) or saved.get('signature') != signature:
+            return None
+        return saved.get('data')
+
+    @staticmethod
+    def save_signed_json(path: str, signature: Any, data: Any) -> bool:
+        """Atomically write `data` to `path` together with the signature it is only valid for."""
+        try:
+            with IO.replace_file(path) as f:
+                json.dump({'signature': signature, 'data': data}, f)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def export_metrics(directory: str = '') -> List[str]:
+        """Write the metrics as JSON and Prometheus text files into `directory` (Config.METRICS_DIR by default)."""
+        try:
+            return METRICS.export(directory or Config.METRICS_DIR)
+        except OSError as e:
+            MsgDCR.FailureMessage(f'Failed to export metrics: {e}')
+            return []
+
     @staticmethod
     def load_config():
         if os.path.exists(Config.CONFIG_FILE):
@@ -22,35 +70,155 @@ class IO:
     @staticmethod
     def save_config(data):
         try:
-            with open(Config.CONFIG_FILE, 'w', encoding='utf-8') as f:
+            with PROFILER.stage('file io'), open(Config.CONFIG_FILE, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=4)
         except Exception as e:
             MsgDCR.FailureMessage(f'Failed to save config: {e}')
     
     @staticmethod
-    def save_file(data:str) -> bool:
-        try:
-            if not os.path.exists(Config.OUTPUT_FILE):
-                os.makedirs(os.path.dirname(os.path.realpath(Config.OUTPUT_FILE)), exist_ok=True)
+    def save_file(data: Union[str, Iterable[str]], path: str = '') -> bool:
+        """
+        Write `data` to the output file; an iterable of chunks is written as it is produced.
 
-            with open(Config.OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                f.write(data)
-            MsgDCR.SuccessMessage(f"ASCII art saved successfully to: {Config.OUTPUT_FILE}")
+        The output is written through IO.replace_file, so a failure leaves an
+        existing file untouched. An exception raised while producing the
+        chunks (a render error of lazily rendered rows) is not a write error:
+        it propagates to the caller.
+        """
+        path = path or Config.OUTPUT_FILE
+        chunks = iter([data] if isinstance(data, str) else data)
+        source_failed = False
+        try:
+            written = 0
+            with IO.replace_file(path) as f:
+                while True:
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        break
+                    except Exception:
+                        source_failed = True
+                        raise
+                    with PROFILER.stage('file io'):
+                        f.write(chunk)
+                    written += len(chunk.encode('utf-8'))
+            BYTES_WRITTEN.inc(written, target='file')
+            MsgDCR.SuccessMessage(f"ASCII art saved successfully to: {path}")
             return True
         except Exception as e:
+            if source_failed:
+                raise
+            ERRORS.inc(kind='write')
             MsgDCR.FailureMessage(f"Error writing to file: {e}")
             return False
+
+    @staticmethod
+    def is_regular_output(path: str) -> bool:
+        """True when `path` is a regular file or does not exist yet, so it can be replaced by a new file."""
+        # stat follows the link, /dev/stdout on a pipe resolves to no real path but still exists
+        return not os.path.exists(path) or os.path.isfile(path)
+
+    @staticmethod
+    @contextmanager
+    def replace_file(path: str, mode: str = 'w', sync: bool = False) -> Iterator[Union[TextIO, BinaryIO]]:
+        """
+        Open a temporary file that replaces `path` once the block finishes without error.
+
+        The temporary file is made next to `path` and given the permissions
+        `path` has (or a new file would get), and `sync` flushes it to disk
+        before the swap. On an error it is removed and `path` stays as it was.
+        A path that is not a regular file (/dev/stdout, a FIFO) cannot be
+        replaced and is opened and written directly.
+        """
+        encoding = None if 'b' in mode else 'utf-8'
+        if not IO.is_regular_output(path):
+            with open(path, mode, encoding=encoding) as f:
+                yield f
+            return
+
+        target = os.path.realpath(path)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode, encoding=encoding) as f:
+                yield f
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            # mkstemp creates the file private, give it the mode the output would have had
+            os.chmod(tmp, IO._file_mode(target))
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _file_mode(path: str) -> int:
+        """Permission bits of `path`, or those open() would give a new file."""
+        try:
+            return os.stat(path).st_mode & 0o7777
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    @staticmethod
+    def stream_stdout(blocks: Iterable[str]) -> None:
+        """Write each block to stdout and flush it right away so the output can feed a pipeline.
+
+        A reader that goes away early (e.g. `| head`) ends the stream quietly
+        instead of raising BrokenPipeError.
+        """
+        try:
+            for block in blocks:
+                with PROFILER.stage('output'):
+                    sys.stdout.write(block)
+                    sys.stdout.flush()
+                BYTES_WRITTEN.inc(len(block.encode('utf-8')), target='stdout')
+        except BrokenPipeError:
+            # Python flushes stdout once more at exit, point it at devnull so that does not fail too
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
     
     @staticmethod
-    def save_writelines_file(data) -> bool:
+    def save_writelines_file(data: Iterable[str]) -> bool:
+        return IO.save_file(data)
+
+    @staticmethod
+    def stream_file(blocks: Iterable[str], total: int = 0, path: str = '', label: str = 'Rendering fonts') -> bool:
+        """Write each block to the output file as soon as it is produced.
+
+        Nothing is accumulated in memory: every block is flushed before the next
+        one is pulled from `blocks`. When `total` is given and stdout is a
+        terminal a `written/total` progress counter is shown.
+        """
+        path = path or Config.OUTPUT_FILE
+        show_progress = total > 0 and sys.stdout.isatty()
+        written = 0
         try:
-            if not os.path.exists(Config.OUTPUT_FILE):
-                os.makedirs(os.path.dirname(os.path.realpath(Config.OUTPUT_FILE)), exist_ok=True)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(os.path.realpath(path)), exist_ok=True)
 
-            with open(Config.OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                f.writelines(data)
-            MsgDCR.SuccessMessage(f"ASCII art saved successfully to: {Config.OUTPUT_FILE}")
+            with open(path, 'w', encoding='utf-8') as f:
+                for block in blocks:
+                    with PROFILER.stage('file io'):
+                        f.write(block)
+                        f.flush()
+                    BYTES_WRITTEN.inc(len(block.encode('utf-8')), target='file')
+                    written += 1
+                    if show_progress:
+                        print(f"\r{MsgDCR.INFO}{label}: {written}/{total}", end='', flush=True)
+            if show_progress:
+                print()
+            MsgDCR.SuccessMessage(f"ASCII art saved successfully to: {path}")
             return True
         except Exception as e:
+            if show_progress:
+                print()
+            ERRORS.inc(kind='write')
             MsgDCR.FailureMessage(f"Error writing to file: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,196 @@
+# -*- coding: UTF-8 -*-
+# core/metrics.py
+
+from __future__ import annotations
+
+import os
+import json
+import math
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Render latency buckets in seconds, from a cached short banner up to a huge all-fonts render
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Metric:
+    type = ''
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[Dict[str, str], object]]:
+        with self._lock:
+            return [(dict(zip(self.labels, key)), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # per-bucket counts (not cumulative) + the +Inf bucket, sum, count
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            index = 0
+            while index < len(self.buckets) and value > self.buckets[index]:
+                index += 1
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> List[Tuple[Dict[str, str], object]]:
+        result = []
+        for labels, (counts, total, count) in super().samples():
+            cumulative = []
+            running = 0
+            for bound, bucket in zip(self.buckets + (math.inf,), counts):
+                running += bucket
+                cumulative.append(('+Inf' if bound == math.inf else repr(bound), running))
+            result.append((labels, {'buckets': dict(cumulative), 'sum': total, 'count': count}))
+        return result
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and histograms with JSON and Prometheus export.
+
+    Values that already live elsewhere (such as cache hit counters) are copied
+    into gauges by `on_collect` callbacks right before each export, so reading
+    them costs nothing in between.
+    """
+
+    def __init__(self, prefix: str = 'chasciigen') -> None:
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name: str, *args, **kwargs) -> _Metric:
+        name = f'{self.prefix}_{name}'
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labels)  # type: ignore
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help, labels)  # type: ignore
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labels, buckets)  # type: ignore
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        if callback not in self._collectors:
+            self._collectors.append(callback)
+
+    def collect(self) -> List[_Metric]:
+        for callback in list(self._collectors):
+            callback()
+        with self._lock:
+            return list(self._metrics.values())
+
+    def reset(self) -> None:
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.clear()
+
+    def to_dict(self) -> Dict[str, dict]:
+        return {
+            metric.name: {
+                'type': metric.type,
+                'help': metric.help,
+                'samples': [{'labels': labels, 'value': value} for labels, value in metric.samples()],
+            }
+            for metric in self.collect()
+        }
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.collect():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for labels, value in metric.samples():
+                if metric.type == 'histogram':
+                    for bound, count in value['buckets'].items():  # type: ignore
+                        lines.append(f'{metric.name}_bucket{_labels(dict(labels, le=bound))} {count}')
+                    lines.append(f'{metric.name}_sum{_labels(labels)} {value["sum"]!r}')  # type: ignore
+                    lines.append(f'{metric.name}_count{_labels(labels)} {value["count"]}')  # type: ignore
+                else:
+                    lines.append(f'{metric.name}{_labels(labels)} {value!r}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory: str) -> List[str]:
+        """Atomically write `metrics.json` and `chasciigen.prom` into `directory` and return their paths."""
+        # Imported here, core.io itself imports this module
+        from core.io import IO
+
+        paths = []
+        for filename, content in (('metrics.json', json.dumps(self.to_dict(), indent=4)),
+                                  (f'{self.prefix}.prom', self.to_prometheus())):
+            path = os.path.join(directory, filename)
+            # Scrapers may read at any moment, so never let them see a half written file
+            with IO.replace_file(path) as f:
+                f.write(content)
+            paths.append(path)
+        return paths
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+METRICS = MetricsRegistry()
+
+RENDER_SECONDS = METRICS.histogram('render_seconds', 'Wall time of one render', ('font', 'engine'))
+FONT_LOADS = METRICS.counter('font_loads_total', 'Fonts loaded from disk, by where they came from', ('source',))
+BYTES_WRITTEN = METRICS.counter('bytes_written_total', 'Bytes of output written', ('target',))
+ERRORS = METRICS.counter('errors_total', 'Errors, by kind', ('kind',))
+CACHE_STATS = METRICS.gauge('cache', 'In-memory cache hits, misses and size', ('cache', 'stat'))
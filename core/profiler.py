@@ -0,0 +1,151 @@
+# -*- coding: UTF-8 -*-
+# core/profiler.py
+
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+# cProfile and tracemalloc are imported by enable(), they are not needed while profiling is off.
+cProfile = None
+tracemalloc = None
+
+# Shared by every stage() call while profiling is off, so a disabled stage
+# allocates nothing and only costs one attribute check and an empty `with`.
+_NULL_STAGE = nullcontext()
+
+
+class _Frame:
+    __slots__ = ('name', 'start', 'memory', 'peak', 'children')
+
+    def __init__(self, name: str, memory: int) -> None:
+        self.name = name
+        self.start = time.perf_counter()
+        self.memory = memory
+        self.peak = memory
+        self.children = 0.0
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler: Profiler, name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.profiler._enter(self.name)
+
+    def __exit__(self, *exc) -> None:
+        self.profiler._exit()
+
+
+class Profiler:
+    """
+    Wall time and peak memory per named stage of a run.
+
+    Code marks its stages with `with PROFILER.stage('font parsing'):`. While
+    the profiler is disabled that returns a shared no-op context. Once enabled,
+    every stage records its calls, total and self time (total minus nested
+    stages), and the peak traced memory above what was allocated when it
+    started. A cProfile and a tracemalloc snapshot can be dumped for a deeper
+    look. Only the thread that enabled the profiler should run stages.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.stats: Dict[str, List] = {}    # name -> [calls, total, self, peak bytes]
+        self._stack: List[_Frame] = []
+        self._cprofile: Optional[cProfile.Profile] = None  # type: ignore
+        self._started_tracing = False
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def enable(self) -> None:
+        global cProfile, tracemalloc
+        if self.enabled:
+            return
+        import cProfile
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+        self.enabled = True
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._cprofile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._stack.clear()
+
+    def reset(self) -> None:
+        """Forget the stage table; the cProfile data keeps accumulating until disable()."""
+        self.stats.clear()
+
+    def _enter(self, name: str) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            parent = self._stack[-1]
+            parent.peak = max(parent.peak, peak)
+        tracemalloc.reset_peak()
+        self._stack.append(_Frame(name, current))
+
+    def _exit(self) -> None:
+        if not self._stack:
+            return
+        frame = self._stack.pop()
+        elapsed = time.perf_counter() - frame.start
+        frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+
+        stats = self.stats.setdefault(frame.name, [0, 0.0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed - frame.children
+        stats[3] = max(stats[3], frame.peak - frame.memory)
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent.children += elapsed
+            # The parent's peak includes whatever this stage reached
+            parent.peak = max(parent.peak, frame.peak)
+
+    def report(self, file=None) -> None:
+        """Print the stage table, slowest self time first (to stderr, keeping stdout for the art)."""
+        file = file or sys.stderr
+        if not self.stats:
+            print('    No profiled stages ran.', file=file)
+            return
+        print(f'\n    {"stage":<18} {"calls":>7} {"total ms":>10} {"self ms":>10} {"peak KiB":>10}', file=file)
+        for name, (calls, total, own, peak) in sorted(self.stats.items(), key=lambda item: -item[1][2]):
+            print(f'    {name:<18} {calls:>7} {total * 1000:>10.2f} {own * 1000:>10.2f} {peak / 1024:>10.1f}',
+                  file=file)
+        print(file=file)
+
+    def dump(self, prefix: str) -> List[str]:
+        """Write `<prefix>.pstats` (cProfile) and `<prefix>.tracemalloc` (memory snapshot) and return the paths."""
+        paths = []
+        if self._cprofile is not None:
+            # dump_stats stops the profiler, resume it if the session goes on
+            self._cprofile.dump_stats(prefix + '.pstats')
+            if self.enabled:
+                self._cprofile.enable()
+            paths.append(prefix + '.pstats')
+        if tracemalloc is not None and tracemalloc.is_tracing():
+            tracemalloc.take_snapshot().dump(prefix + '.tracemalloc')
+            paths.append(prefix + '.tracemalloc')
+        return paths
+
+
+PROFILER = Profiler()
@@ -0,0 +1,129 @@
+# -*- coding: UTF-8 -*-
+# core/registry.py
+
+from __future__ import annotations
+
+import os
+import pathlib
+import threading
+import importlib.resources
+from typing import Dict, Iterator, List, Optional
+
+import pyfiglet
+from pyfiglet import FigletFont, SHARED_DIRECTORY
+
+from core.font_search import FontNameIndex
+from core.io import IO
+from core.profiler import PROFILER
+
+
+class FontRegistry:
+    """
+    Process-wide list of the installed FIGlet fonts.
+
+    `FigletFont.getFonts()` opens every font file to check its header, so the
+    resulting list is persisted as `fonts.json` in the cache directory together
+    with the mtimes of the font directories. Adding or removing a font changes a
+    directory mtime, which triggers a rescan; otherwise the list is read back
+    as is. Nothing is loaded until the fonts are first asked for.
+    """
+
+    FORMAT_VERSION = 1
+    _shared: Optional[FontRegistry] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = '') -> None:
+        self._path = path
+        self._fonts: Optional[List[str]] = None
+        self._index: Dict[str, int] = {}
+        self._name_index: Optional[FontNameIndex] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> FontRegistry:
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @property
+    def path(self) -> str:
+        # Resolved on use so a cache_dir loaded from config.json after start-up is honoured.
+        return self._path or IO.cache_dir('fonts.json')
+
+    @property
+    def fonts(self) -> List[str]:
+        if self._fonts is None:
+            self._load()
+        return self._fonts
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """Font name -> 0-based position in `fonts`."""
+        if self._fonts is None:
+            self._load()
+        return self._index
+
+    @property
+    def name_index(self) -> FontNameIndex:
+        """Trigram index over the font names, built on first search."""
+        if self._name_index is None:
+            self._name_index = FontNameIndex(self.fonts)
+        return self._name_index
+
+    def __len__(self) -> int:
+        return len(self.fonts)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.fonts)
+
+    def __contains__(self, font: str) -> bool:
+        return font in self.index
+
+    @staticmethod
+    def directories() -> List[str]:
+        package = importlib.resources.files('pyfiglet.fonts')
+        directories = [str(package)] if isinstance(package, pathlib.Path) else []
+        if os.path.isdir(SHARED_DIRECTORY):
+            directories.append(SHARED_DIRECTORY)
+        return directories
+
+    def signature(self) -> Optional[List]:
+        """Identify the current font install, or None when it cannot be watched for changes."""
+        # Fonts shipped inside a zip have no directory mtime to watch, never trust a stored list then.
+        if not isinstance(importlib.resources.files('pyfiglet.fonts'), pathlib.Path):
+            return None
+        try:
+            return [self.FORMAT_VERSION, pyfiglet.__version__] + [
+                [directory, os.stat(directory).st_mtime_ns] for directory in self.directories()
+            ]
+        except OSError:
+            return None
+
+    def _load(self) -> None:
+        with self._lock, PROFILER.stage('font discovery'):
+            if self._fonts is not None:
+                return
+            signature = self.signature()
+            fonts = IO.load_signed_json(self.path, signature) if signature is not None else None
+            if not isinstance(fonts, list):
+                fonts = FigletFont.getFonts()
+                if signature is not None:
+                    IO.save_signed_json(self.path, signature, fonts)
+            self._set(fonts)
+
+    def refresh(self) -> List[str]:
+        """Rescan the font directories and rewrite the persisted list."""
+        with self._lock:
+            fonts = FigletFont.getFonts()
+            signature = self.signature()
+            if signature is not None:
+                IO.save_signed_json(self.path, signature, fonts)
+            self._set(fonts)
+        return fonts
+
+    def _set(self, fonts: List[str]) -> None:
+        self._index = {font: i for i, font in enumerate(fonts)}
+        self._name_index = None
+        self._fonts = fonts
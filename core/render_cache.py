@@ -0,0 +1,208 @@
+# -*- coding: UTF-8 -*-
+# core/render_cache.py
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pyfiglet
+
+from core.config import Config
+from core.font_cache import CompiledFontCache
+from core.io import IO
+
+
+class RenderCache:
+    """
+    Rendered art kept on disk between runs, keyed by a hash of the render inputs.
+
+    Entries live in one SQLite database in the cache directory (`renders.db`),
+    which several processes can read and write at once. Every entry records
+    its size and when it was last used, and a one-row `meta` table keeps the
+    running total; a store that pushes the total over the configured maximum
+    evicts the least recently used entries in the same transaction. Database
+    errors are treated as misses, so a broken or busy cache only costs a
+    render. sqlite3 is imported on first use.
+
+    Opening the database costs more than rendering a short text, so the
+    cache is off unless Config.RENDER_CACHE (or --cache) turns it on.
+    """
+
+    FORMAT_VERSION = 2
+    _shared: Optional[RenderCache] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = '', max_bytes: int = 0) -> None:
+        self._path = path
+        self._max_bytes = max_bytes
+        self._db = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls) -> RenderCache:
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @property
+    def path(self) -> str:
+        return self._path or IO.cache_dir('renders.db')
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes or int(Config.RENDER_CACHE_MAX_MB * 1024 * 1024)
+
+    @classmethod
+    def key(cls, text: str, font: str, width: int) -> str:
+        """Hash of everything a render depends on; `font` must already be resolved."""
+        # The font files are in it too, so a reinstalled or edited font is rendered afresh
+        fonts = [cls._font_signature(name) for name in font.split(',')]
+        inputs = [cls.FORMAT_VERSION, text, font, width, pyfiglet.__version__, fonts]
+        return hashlib.sha256(json.dumps(inputs).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _font_signature(font: str) -> List[int]:
+        """[mtime_ns, size] of the font file, zeros for fonts that are not plain files."""
+        path = CompiledFontCache.font_path(font)
+        if path is None:
+            return [0, 0]
+        try:
+            st = os.stat(path)
+        except OSError:
+            return [0, 0]
+        return [st.st_mtime_ns, st.st_size]
+
+    def _connect(self):
+        if self._db is None:
+            import sqlite3
+
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS renders ('
+                       'key TEXT PRIMARY KEY, art TEXT NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS renders_used ON renders (used)')
+            db.execute('CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)')
+            # Only sums the entries when the table is new, e.g. for a database of an older version
+            db.execute('INSERT OR IGNORE INTO meta (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM renders')
+            self._db = db
+        return self._db
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """Return the cached rows for `key` and mark the entry as used, or None on a miss."""
+        try:
+            with self._lock:
+                db = self._connect()
+                row = db.execute('SELECT art FROM renders WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    db.execute('UPDATE renders SET used = ? WHERE key = ?', (time.time(), key))
+        except Exception:
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        art = row[0]
+        return art[:-1].split('\n') if art else []
+
+    def put(self, key: str, rows: Iterable[str]) -> bool:
+        art = ''.join(row + '\n' for row in rows)
+        size = len(art.encode('utf-8'))
+        if size > self.max_bytes:
+            return False
+        try:
+            with self._lock:
+                db = self._connect()
+                db.execute('BEGIN IMMEDIATE')
+                try:
+                    replaced = db.execute('SELECT size FROM renders WHERE key = ?', (key,)).fetchone()
+                    db.execute('INSERT OR REPLACE INTO renders (key, art, size, used) VALUES (?, ?, ?, ?)',
+                               (key, art, size, time.time()))
+                    db.execute('UPDATE meta SET total = total + ? WHERE id = 0',
+                               (size - (replaced[0] if replaced else 0),))
+                    self._evict(db)
+                    db.execute('COMMIT')
+                except Exception:
+                    db.execute('ROLLBACK')
+                    raise
+            return True
+        except Exception:
+            return False
+
+    def _evict(self, db) -> None:
+        total = db.execute('SELECT total FROM meta WHERE id = 0').fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        freed = 0
+        stale = []
+        for key, size in db.execute('SELECT key, size FROM renders ORDER BY used'):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        db.executemany('DELETE FROM renders WHERE key = ?', stale)
+        db.execute('UPDATE meta SET total = total - ? WHERE id = 0', (freed,))
+
+    def tee(self, key: str, rows: Iterable[str]) -> Iterator[str]:
+        """
+        Pass `rows` through, storing them under `key` once they are exhausted.
+
+        Rows are only collected up to an eighth of the maximum cache size, so
+        streaming a huge render does not pile up in memory for the cache.
+        """
+        limit = self.max_bytes // 8
+        collected: Optional[List[str]] = []
+        size = 0
+        for row in rows:
+            if collected is not None:
+                size += len(row) + 1
+                if size > limit:
+                    collected = None
+                else:
+                    collected.append(row)
+            yield row
+        if collected is not None:
+            self.put(key, collected)
+
+    def clear(self) -> bool:
+        try:
+            with self._lock:
+                db = self._connect()
+                db.execute('BEGIN IMMEDIATE')
+                try:
+                    db.execute('DELETE FROM renders')
+                    db.execute('UPDATE meta SET total = 0 WHERE id = 0')
+                    db.execute('COMMIT')
+                except Exception:
+                    db.execute('ROLLBACK')
+                    raise
+            self.hits = 0
+            self.misses = 0
+            return True
+        except Exception:
+            return False
+
+    def info(self) -> Dict[str, int]:
+        try:
+            with self._lock:
+                entries, size = self._connect().execute(
+                    'SELECT (SELECT COUNT(*) FROM renders), total FROM meta WHERE id = 0').fetchone()
+        except Exception:
+            entries, size = 0, 0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': entries,
+            'bytes': size,
+            'capacity': self.max_bytes,
+        }
@@ -0,0 +1,159 @@
+# -*- coding: UTF-8 -*-
+# core/server.py
+
+import os
+import json
+import asyncio
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from core.ascii_art import Figlet
+from core.config import Config, RENDER_ENGINES
+from core.exception import ChAsciiGenFontError
+from ui.decorators import MsgDCR
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class RenderServer:
+    """
+    Small HTTP/1.1 service in front of the renderer, bound to localhost by default.
+
+        GET /render?text=Hi&font=slant&width=80&engine=glyph  -> text/plain art
+        GET /fonts                                            -> JSON font list
+        GET /search?q=sla                                     -> JSON matching fonts
+
+    Requests are parsed on an asyncio event loop and rendered with
+    Figlet.arender on a bounded process pool. Each worker keeps its own
+    parsed-font LRU, backed by the compiled on-disk font cache they all
+    share, and arender lets identical requests that arrive while the first
+    one is still rendering wait for that same result.
+    """
+
+    STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+              413: 'Payload Too Large', 500: 'Internal Server Error'}
+    MAX_TEXT = 4096
+    MAX_WIDTH = 10000
+
+    def __init__(self, host: str = '', port: int = 0, workers: int = 0) -> None:
+        self.host = host or Config.SERVER_HOST
+        self.port = port or Config.SERVER_PORT
+        self.workers = workers or Config.SERVER_WORKERS or os.cpu_count() or 1
+        self.figlet = Figlet()
+        self.stats = {'requests': 0}
+
+    def run(self) -> int:
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            MsgDCR.InfoMessage('Server stopped.')
+        except OSError as e:
+            MsgDCR.FailureMessage(f'Could not start server: {e}')
+            return 1
+        return 0
+
+    async def serve(self) -> None:
+        # Keep at most two renders queued per worker, the rest wait on the event loop.
+        Figlet.set_executor(workers=self.workers, concurrency=self.workers * 2)
+        try:
+            server = await asyncio.start_server(self.handle, self.host, self.port)
+            MsgDCR.InfoMessage(f'Serving on http://{self.host}:{self.port} with {self.workers} worker(s)')
+            async with server:
+                await server.serve_forever()
+        finally:
+            Figlet.set_executor()
+
+    async def render(self, text: str, font: str, width: int, engine: str) -> str:
+        try:
+            return await self.figlet.arender(text, font, width, engine)
+        except Exception as e:
+            raise HTTPError(500, str(e) or e.__class__.__name__)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                parts = request_line.split()
+                method, target, version = (parts + ['', '', ''])[:3]
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                self.stats['requests'] += 1
+
+                try:
+                    status, content_type, body = await self.dispatch(method, target)
+                except HTTPError as e:
+                    status, content_type, body = e.status, 'application/json', json.dumps({'error': str(e)})
+
+                payload = body.encode('utf-8')
+                writer.write(
+                    f'HTTP/1.1 {status} {self.STATUS[status]}\r\n'
+                    f'Content-Type: {content_type}; charset=utf-8\r\n'
+                    f'Content-Length: {len(payload)}\r\n'
+                    f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1')
+                    + (payload if method != 'HEAD' else b'')
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str) -> Tuple[int, str, str]:
+        if method not in ('GET', 'HEAD'):
+            raise HTTPError(405, f'Method {method} is not allowed')
+
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query, keep_blank_values=True).items()}
+
+        if url.path == '/render':
+            return 200, 'text/plain', await self.render(*self.render_args(query))
+        if url.path == '/fonts':
+            return 200, 'application/json', json.dumps(self.figlet._fonts)
+        if url.path == '/search':
+            # The first search loads the font indexes, so it runs off the event loop like a render
+            return 200, 'application/json', json.dumps(await self.figlet.asearch(query.get('q', '')))
+        if url.path == '/stats':
+            return 200, 'application/json', json.dumps(dict(self.stats, **Figlet.async_info()))
+        raise HTTPError(404, f'No such endpoint: {url.path}')
+
+    def render_args(self, query: Dict[str, str]) -> Tuple[str, str, int, str]:
+        text = query.get('text')
+        if text is None:
+            raise HTTPError(400, "Missing 'text' parameter")
+        if len(text) > self.MAX_TEXT:
+            raise HTTPError(413, f"'text' is longer than {self.MAX_TEXT} characters")
+
+        try:
+            width = int(query.get('width') or Config.MAX_WIDTH)
+        except ValueError:
+            raise HTTPError(400, "'width' must be an integer")
+        if not 1 <= width <= self.MAX_WIDTH:
+            raise HTTPError(400, f"'width' must be between 1 and {self.MAX_WIDTH}")
+
+        engine = query.get('engine') or Config.RENDER_ENGINE
+        if engine not in RENDER_ENGINES:
+            raise HTTPError(400, f"'engine' must be one of: {', '.join(RENDER_ENGINES)}")
+
+        try:
+            font = ','.join(self.figlet.resolve_fonts(query.get('font') or Config.DEFAULT_FONT))
+        except ChAsciiGenFontError as e:
+            raise HTTPError(404, str(e))
+        return text, font, width, engine
@@ -0,0 +1,196 @@
+# -*- coding: UTF-8 -*-
+# core/shard.py
+
+from __future__ import annotations
+
+import os
+import hashlib
+from typing import Dict, List, Sequence, Tuple
+
+from core.ascii_art import Figlet
+from core.checkpoint import CheckpointedRun
+from core.font_fit import GlyphMetrics
+from core.font_index import FontIndex
+from core.io import IO
+from core.metrics import BYTES_WRITTEN, ERRORS
+from core.profiler import PROFILER
+from ui.decorators import MsgDCR
+
+
+class FontShards:
+    """
+    All-fonts output split over several machines ("--all-fonts --shard i/N").
+
+    The fonts are dealt out by estimated render cost: loading a font costs
+    about its file size, drawing the text about CELL_COST per glyph cell
+    (the glyph widths of the text times the font height, from the
+    GlyphMetrics table). Fonts are taken from the most expensive down and
+    each goes to the shard with the least cost so far, ties broken by font
+    name and shard number, so every machine with the same fonts computes
+    the same split. Each shard writes its blocks like a plain run and an
+    index next to its output (`<output>.shard.json`) that `merge` uses to
+    put the blocks back in font order.
+    """
+
+    FORMAT_VERSION = 1
+    SUFFIX = '.shard.json'
+    # Render time of one glyph cell in bytes of font file parsed, measured on the bundled fonts
+    CELL_COST = 6
+
+    def __init__(self, figlet: Figlet, number: int, count: int) -> None:
+        self.figlet = figlet
+        self.number = number
+        self.count = count
+
+    @staticmethod
+    def parse(spec: str) -> Tuple[int, int]:
+        """Parse 'i/N' into (i, N), raising ValueError unless 1 <= i <= N."""
+        number, sep, count = spec.partition('/')
+        try:
+            number, count = int(number), int(count)
+        except ValueError:
+            number = count = 0
+        if not sep or count < 1 or not 1 <= number <= count:
+            raise ValueError(f"Invalid shard '{spec}', expected i/N with 1 <= i <= N (e.g. 2/4).")
+        return number, count
+
+    @classmethod
+    def index_path(cls, path: str) -> str:
+        return os.path.realpath(path) + cls.SUFFIX
+
+    @classmethod
+    def cost(cls, font: str, text: str) -> float:
+        info = FontIndex.shared().get(font)
+        if info is None:
+            return 1.0
+        metrics = GlyphMetrics.shared().get(font)
+        glyphs = metrics.glyphs if metrics is not None else {}
+        widths = sum(glyphs[ord(ch)][0] if ord(ch) in glyphs else info.avg_width
+                     for ch in text if ch != '\n')
+        return info.file_size + cls.CELL_COST * info.height * widths
+
+    @classmethod
+    def partition(cls, fonts: Sequence[str], text: str, count: int) -> List[List[str]]:
+        """Split `fonts` into `count` lists of about the same total cost, each in the order of `fonts`."""
+        costs = {font: cls.cost(font, text) for font in fonts}
+        loads = [0.0] * count
+        owner: Dict[str, int] = {}
+        for font in sorted(fonts, key=lambda f: (-costs[f], f)):
+            shard = min(range(count), key=lambda i: (loads[i], i))
+            owner[font] = shard
+            loads[shard] += costs[font]
+        shards: List[List[str]] = [[] for _ in range(count)]
+        for font in fonts:
+            shards[owner[font]].append(font)
+        return shards
+
+    def fonts(self, text: str) -> List[str]:
+        return self.partition(self.figlet._fonts, text, self.count)[self.number - 1]
+
+    def run(self, text: str, path: str, width: int = 80, jobs: int = 1, resume: bool = False) -> bool:
+        fonts = self.fonts(text)
+        MsgDCR.InfoMessage(f'Shard {self.number}/{self.count}: {len(fonts)} of {len(self.figlet._fonts)} fonts.')
+        checkpoint = CheckpointedRun(self.figlet, path)
+        if not checkpoint.run(text, width=width, jobs=jobs, resume=resume, fonts=fonts):
+            return False
+
+        blocks = []
+        start = 0
+        for font, end, digest, error in checkpoint.entries:
+            blocks.append([font, start, end - start, digest, error])
+            start = end
+        index = {
+            'shard': self.number,
+            'count': self.count,
+            'text': hashlib.sha256(text.encode('utf-8')).hexdigest(),
+            'width': width,
+            'fonts': self.figlet._fonts,
+            'blocks': blocks,
+        }
+        if not IO.save_signed_json(self.index_path(path), [self.FORMAT_VERSION], index):
+            ERRORS.inc(kind='write')
+            MsgDCR.FailureMessage(f'Error writing the shard index: {self.index_path(path)}')
+            return False
+        return True
+
+    @classmethod
+    def merge(cls, paths: Sequence[str], output: str) -> bool:
+        """
+        Combine shard outputs into the file a single run over all fonts writes.
+
+        Checks that the shards come from the same text, width and font set,
+        that each of 1..N is given once and every font is covered, and that
+        every block still matches its hash, before replacing `output`.
+        """
+        indexes: Dict[int, Tuple[str, dict]] = {}
+        for path in paths:
+            index = IO.load_signed_json(cls.index_path(path), [cls.FORMAT_VERSION])
+            if not isinstance(index, dict):
+                MsgDCR.FailureMessage(f'{path} has no shard index, was it written with --all-fonts --shard?')
+                return False
+            first_path, first = next(iter(indexes.values()), (path, index))
+            if any(index[key] != first[key] for key in ('count', 'text', 'width', 'fonts')):
+                MsgDCR.FailureMessage(f'{path} and {first_path} were written for a different text, width, '
+                                      f'font set or shard count.')
+                return False
+            if index['shard'] in indexes:
+                MsgDCR.FailureMessage(f"Shard {index['shard']} is given twice: "
+                                      f"{indexes[index['shard']][0]} and {path}")
+                return False
+            indexes[index['shard']] = (path, index)
+
+        if not indexes:
+            MsgDCR.FailureMessage('No shard outputs given.')
+            return False
+        count = next(iter(indexes.values()))[1]['count']
+        missing = [str(number) for number in range(1, count + 1) if number not in indexes]
+        if missing:
+            MsgDCR.FailureMessage(f"Missing shard(s) {', '.join(missing)} of {count}.")
+            return False
+
+        located: Dict[str, Tuple[str, list]] = {}
+        for path, index in indexes.values():
+            for block in index['blocks']:
+                located[block[0]] = (path, block)
+        fonts = next(iter(indexes.values()))[1]['fonts']
+        absent = [font for font in fonts if font not in located]
+        if absent:
+            MsgDCR.FailureMessage(f"The shards do not cover {len(absent)} font(s), e.g. '{absent[0]}'.")
+            return False
+
+        return cls._write(fonts, located, output)
+
+    @staticmethod
+    def _write(fonts: List[str], located: Dict[str, Tuple[str, list]], output: str) -> bool:
+        handles: Dict[str, object] = {}
+        written = failed = size = 0
+        try:
+            with IO.replace_file(output, 'wb') as out:
+                for font in fonts:
+                    path, (_, offset, length, digest, error) = located[font]
+                    if error:
+                        # A single run leaves failed fonts out as well
+                        failed += 1
+                        continue
+                    if path not in handles:
+                        handles[path] = open(path, 'rb')
+                    with PROFILER.stage('file io'):
+                        handles[path].seek(offset)
+                        block = handles[path].read(length)
+                    if hashlib.sha256(block).hexdigest() != digest:
+                        raise ValueError(f"the block of font '{font}' in {path} changed since the shard was written")
+                    with PROFILER.stage('file io'):
+                        out.write(block)
+                    written += 1
+                    size += len(block)
+        except Exception as e:
+            ERRORS.inc(kind='write')
+            MsgDCR.FailureMessage(f"Error merging shards: {e}")
+            return False
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        BYTES_WRITTEN.inc(size, target='file')
+        MsgDCR.SuccessMessage(f"Merged {written} fonts into: {output}" + (f" ({failed} failed)" if failed else ''))
+        return True
@@ -0,0 +1,180 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyfiglet
+
+from core.ascii_art import Figlet
+from ui.colorize import colorize, decolorize
+from ui.display import CenteredBanner
+
+FORMAT_VERSION = 1
+
+# Fixed inputs, so results stay comparable between runs and machines
+FONTS = ['standard', 'slant', 'banner3', 'big', 'doom', 'block', 'small', 'shadow',
+         'univers', 'starwars', 'isometric1', 'mini', 'colossal', 'epic', '3d-ascii', 'ansi_shadow']
+TEXTS = ['Hi', 'Hello World', 'The quick brown fox jumps over the lazy dog 0123456789']
+SWEEP_TEXT = 'Bench'
+SEARCH_KEYWORDS = ['slant', 'big', 'a', '3d', 'slnt', 'blok', 'zzzz']
+COLOR_ARGS = [('%BoldRed', 'root', '%BoldWhite', '@', '%BoldBlue', 'ChAsciiGen', '%BoldRed', ' ~# '),
+              ('%DimPink', 'Hello ', '%Bold', 'world !'),
+              ('%BgBlue', '%Yellow', 'Hello'),
+              ('Hello world !',)]
+
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=None):
+    """Register `func() -> callable`: the setup runs once, only the returned callable is timed."""
+    def register(func):
+        BENCHMARKS.append((name, func, repeat))
+        return func
+    return register
+
+
+def quiet(func):
+    """Wrap `func` so whatever it prints is swallowed instead of timed against the terminal."""
+    def run():
+        with redirect_stdout(io.StringIO()):
+            func()
+    return run
+
+
+def _render_font(font):
+    figlet = Figlet()
+
+    def setup():
+        Figlet.renderer(font, 80)  # parse the font outside the timing
+        return lambda: [figlet.text2ascii(text, font=font, width=80) for text in TEXTS]
+    return setup
+
+
+for _font in FONTS:
+    benchmark(f'render/{_font}')(_render_font(_font))
+
+
+@benchmark('all_fonts/sweep', repeat=1)
+def all_fonts_sweep():
+    figlet = Figlet()
+    return lambda: sum(1 for _ in figlet.render_all_fonts(SWEEP_TEXT, width=80))
+
+
+@benchmark('search/search_font')
+def search_fonts():
+    figlet = Figlet()
+    figlet._term_width = 120
+    return quiet(lambda: [figlet.search_font(keyword) for keyword in SEARCH_KEYWORDS])
+
+
+@benchmark('search/highlight')
+def highlight_fonts():
+    figlet = Figlet()
+    fonts = list(figlet._fonts)
+    return lambda: [figlet.highlight(keyword, font) for keyword in SEARCH_KEYWORDS for font in fonts]
+
+
+@benchmark('colorize/colorize')
+def colorize_args():
+    return lambda: [colorize(*args) for _ in range(500) for args in COLOR_ARGS]
+
+
+@benchmark('colorize/decolorize')
+def decolorize_strings():
+    strings = [colorize(*args) for args in COLOR_ARGS] * 500
+    return lambda: [decolorize(string) for string in strings]
+
+
+@benchmark('display/center_text')
+def center_large_art():
+    art = Figlet.render(' '.join(TEXTS) * 4, 'banner3', 400)
+    colored = '\n'.join(colorize('%BoldRed', line) for line in art.splitlines())
+    banner = CenteredBanner(clear_screen=False)
+    banner.get_console_size = lambda: (320, 100)
+    return lambda: (banner.center_text(art), banner.center_text(colored, vertical=True))
+
+
+def measure(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(samples), 'min_s': min(samples), 'runs': repeat}
+
+
+def run(patterns, repeat):
+    results = {}
+    for name, setup, fixed_repeat in BENCHMARKS:
+        if patterns and not any(pattern in name for pattern in patterns):
+            continue
+        func = setup()
+        func()  # warm up caches the way a long running session would have them
+        results[name] = measure(func, fixed_repeat or repeat)
+        print(f'    {name:<24} {results[name]["median_s"] * 1000:10.3f} ms')
+    return {
+        'format': FORMAT_VERSION,
+        'meta': {
+            'python': platform.python_version(),
+            'pyfiglet': pyfiglet.__version__,
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print the change of every benchmark against the baseline and return the names that regressed."""
+    regressions = []
+    print(f'\n    {"benchmark":<24} {"baseline":>12} {"current":>12} {"change":>8}')
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f'    {name:<24} {"-":>12} {result["median_s"] * 1000:10.3f}ms {"new":>8}')
+            continue
+        change = result['median_s'] / before['median_s'] - 1 if before['median_s'] else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'    {name:<24} {before["median_s"] * 1000:10.3f}ms {result["median_s"] * 1000:10.3f}ms {change:+7.1%}{flag}')
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the ChAsciiGen benchmark suite')
+    parser.add_argument('patterns', nargs='*', help='only run benchmarks whose name contains one of these')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='timed runs per benchmark (Default: 5)')
+    parser.add_argument('-o', '--output', type=str, help='write the results as JSON to this file')
+    parser.add_argument('-c', '--compare', type=str, help='baseline JSON file to compare against')
+    parser.add_argument('-t', '--threshold', type=float, default=0.15,
+                        help='slowdown ratio counted as a regression (Default: 0.15 = 15%%)')
+    parser.add_argument('-l', '--list', action='store_true', help='list the benchmarks and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for name, _, _ in BENCHMARKS:
+            print(f'    {name}')
+        sys.exit(0)
+
+    results = run(args.patterns, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('format') != FORMAT_VERSION:
+            sys.exit(f'    {args.compare} was written by another version of this suite')
+        regressions = compare(results, baseline, args.threshold)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ascii_art import Figlet
+from core.config import RENDER_ENGINES
+
+SENTENCE = 'The quick brown fox jumps over the lazy dog. '
+
+
+def bench_engines(fonts, text, width, engines):
+    totals = {engine: 0.0 for engine in engines}
+    failures = {engine: 0 for engine in engines}
+    mismatches = []
+    for font in fonts:
+        results = {}
+        for engine in engines:
+            Figlet.renderer(font, width)  # keep font loading out of the timings
+            start = time.perf_counter()
+            try:
+                results[engine] = Figlet.render(text, font, width, engine)
+            except Exception as e:
+                results[engine] = f'<{e.__class__.__name__}>'
+                failures[engine] += 1
+            totals[engine] += time.perf_counter() - start
+        if len(set(results.values())) > 1:
+            mismatches.append(font)
+    return totals, failures, mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare rendering engines over all fonts')
+    parser.add_argument('-w', '--width', type=int, default=2000)
+    parser.add_argument('-n', '--sentences', type=int, default=40,
+                        help='length of the rendered text in sentences (Default: 40)')
+    parser.add_argument('fonts', nargs='*')
+    args = parser.parse_args()
+
+    engines = list(RENDER_ENGINES)
+
+    fonts = args.fonts or Figlet()._fonts
+    text = SENTENCE * args.sentences
+    totals, failures, mismatches = bench_engines(fonts, text, args.width, engines)
+
+    print(f'    {len(fonts)} fonts, {len(text)} chars, width {args.width}')
+    for engine in engines:
+        speedup = totals['pyfiglet'] / totals[engine] if totals[engine] else 0
+        print(f'    {engine:<10} {totals[engine]:8.2f}s  x{speedup:.2f}  ({failures[engine]} failed)')
+    for font in mismatches:
+        print(f'    MISMATCH font={font}')
+    sys.exit(1 if mismatches else 0)
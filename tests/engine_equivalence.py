@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ascii_art import Figlet
+
+CORPUS = [
+    "Hello World",
+    "a b c d e f g h i j k l m n o p q r s t",
+    "The quick brown fox 0123456789 !@#$%^&*()",
+    "line1\nline two here\n\nx",
+    "a\nb",
+    "a\n",
+    "\nx",
+    "a\n\nb",
+    "x\n\n",
+    "  lead  trail  ",
+    "ÄÖÜ äöü ß ~{}[]|\\/<>",
+    "",
+]
+WIDTHS = (80, 40)
+
+
+def render(text, font, width, engine):
+    try:
+        return Figlet.render(text, font, width, engine)
+    except Exception as e:
+        return f'<{e.__class__.__name__}>'
+
+
+def render_lines(text, font, width, engine):
+    try:
+        return ''.join(row + '\n' for row in Figlet.render_lines(text, font, width, engine))
+    except Exception as e:
+        return f'<{e.__class__.__name__}>'
+
+
+def check_engines(engine='glyph', fonts=None):
+    fonts = fonts or Figlet()._fonts
+    mismatches = []
+    timings = {'pyfiglet': 0.0, engine: 0.0}
+    for font in fonts:
+        for text in CORPUS:
+            for width in WIDTHS:
+                results = {}
+                for name in timings:
+                    start = time.perf_counter()
+                    results[name] = render(text, font, width, name)
+                    timings[name] += time.perf_counter() - start
+                if results['pyfiglet'] != results[engine]:
+                    mismatches.append((font, text, width))
+                # The line iterator must give the rows of the whole render, multi-line input included
+                for name in timings:
+                    if render_lines(text, font, width, name) != results['pyfiglet']:
+                        mismatches.append((font, text, width, f'{name} lines'))
+    return mismatches, timings
+
+
+if __name__ == "__main__":
+    engine = sys.argv[1] if len(sys.argv) > 1 else 'glyph'
+    mismatches, timings = check_engines(engine, sys.argv[2:] or None)
+    for font, text, width, *path in mismatches:
+        print(f'    MISMATCH font={font} width={width} text={text!r} {" ".join(path)}'.rstrip())
+    for name, seconds in timings.items():
+        print(f'    {name:<10} {seconds:.2f}s')
+    print(f'    {len(mismatches)} mismatches')
+    sys.exit(1 if mismatches else 0)
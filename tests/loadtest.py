@@ -0,0 +1,79 @@
+import sys
+import time
+import argparse
+import http.client
+import statistics
+import threading
+from urllib.parse import urlencode
+
+WORDS = ['Hello', 'World', 'Build', 'Deploy', 'Staging', 'Prod', 'Banner', 'Ascii']
+
+
+def worker(host, port, paths, latencies, errors, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+    conn.close()
+
+
+def percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def load_test(host, port, requests, concurrency, font, width, engine, unique):
+    paths = []
+    for i in range(requests):
+        # --unique makes every text distinct so request coalescing cannot help
+        text = f'{WORDS[i % len(WORDS)]} {i}' if unique else WORDS[i % len(WORDS)]
+        paths.append('/render?' + urlencode({'text': text, 'font': font, 'width': width, 'engine': engine}))
+
+    latencies, errors, lock = [], [0], threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(host, port, paths[i::concurrency], latencies, errors, lock))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, sorted(latencies), errors[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load test a running "ChAsciiGen.py --serve" instance')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('-p', '--port', type=int, default=8765)
+    parser.add_argument('-n', '--requests', type=int, default=2000)
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-f', '--font', default='standard')
+    parser.add_argument('-w', '--width', type=int, default=80)
+    parser.add_argument('-e', '--engine', default='glyph')
+    parser.add_argument('--unique', action='store_true', help='render a different text for every request')
+    args = parser.parse_args()
+
+    elapsed, latencies, errors = load_test(args.host, args.port, args.requests, args.concurrency,
+                                           args.font, args.width, args.engine, args.unique)
+
+    print(f'    {len(latencies)} requests, concurrency {args.concurrency}, {errors} errors')
+    print(f'    {len(latencies) / elapsed:10.1f} req/s')
+    print(f'    p50 {percentile(latencies, 50) * 1000:8.2f} ms')
+    print(f'    p99 {percentile(latencies, 99) * 1000:8.2f} ms')
+    sys.exit(1 if errors else 0)
@@ -1,8 +1,13 @@
+import os
+import sys
 import shutil
-from pyfiglet import FigletFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.registry import FontRegistry
 
 def showfonts():
-    fonts = FigletFont.getFonts()
+    fonts = FontRegistry.shared().fonts
     term_width = shutil.get_terminal_size().columns
     numbered_fonts = [f"{i+1}. {font}" for i, font in enumerate(fonts)]
     max_len = max(len(item) for item in numbered_fonts) + 2
@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'ChAsciiGen.py')
+# Time the in-process start itself: no running daemon answers and no cached render is replayed
+ENV = dict(os.environ, CHASCIIGEN_NO_DAEMON='1')
+FLAGS = ['--no-cache']
+
+# (label, arguments) of the start-up paths worth watching
+SCENARIOS = [
+    ('version', ['--version']),
+    ('render', ['hi']),
+    ('render slant', ['-f', 'slant', 'hi']),
+    ('search', ['-s', 'slant']),
+]
+
+
+def first_output(args):
+    """Run ChAsciiGen once, return (seconds to the first stdout byte, seconds to exit)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, SCRIPT] + FLAGS + args, cwd=ROOT, env=ENV,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    proc.stdout.read(1)
+    first = time.perf_counter() - start
+    proc.stdout.read()
+    proc.wait()
+    return first, time.perf_counter() - start
+
+
+def import_times(args):
+    """Return {module: cumulative microseconds} for the top level imports of one run."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', SCRIPT] + FLAGS + args, cwd=ROOT, env=ENV,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented, keep only the ones the program itself triggered
+        if not name.startswith('  '):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def run(runs, top):
+    results = {}
+    for label, args in SCENARIOS:
+        first_output(args)  # warm the OS file cache and the on-disk font caches
+        samples = [first_output(args) for _ in range(runs)]
+        imports = import_times(args)
+        results[label] = {
+            'first_output_ms': statistics.median(s[0] for s in samples) * 1000,
+            'total_ms': statistics.median(s[1] for s in samples) * 1000,
+            'import_ms': sum(imports.values()) / 1000,
+            'top_imports': sorted(imports.items(), key=lambda item: -item[1])[:top],
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure ChAsciiGen start-up time')
+    parser.add_argument('-n', '--runs', type=int, default=10, help='runs per scenario, the median is reported')
+    parser.add_argument('-t', '--top', type=int, default=5, help='slowest top level imports to list')
+    parser.add_argument('--json', type=str, help='also write the results to this file')
+    parser.add_argument('--max-ms', type=float, default=0,
+                        help='exit with 1 when any scenario takes longer than this to first output')
+    args = parser.parse_args()
+
+    results = run(args.runs, args.top)
+
+    print(f'    {"scenario":<14} {"imports":>9} {"1st output":>11} {"total":>9}')
+    for label, result in results.items():
+        print(f'    {label:<14} {result["import_ms"]:7.1f}ms {result["first_output_ms"]:9.1f}ms {result["total_ms"]:7.1f}ms')
+        for module, micros in result['top_imports']:
+            print(f'        {module:<28} {micros / 1000:6.1f}ms')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+
+    slow = [label for label, result in results.items() if args.max_ms and result['first_output_ms'] > args.max_ms]
+    for label in slow:
+        print(f'    SLOW {label}: over {args.max_ms:.0f}ms to first output')
+    sys.exit(1 if slow else 0)
@@ -2,7 +2,6 @@
 # ui/colorize.py
 
 import re
-import difflib
 
 from colorama import Fore, Back, Style, init
 init(autoreset=True)
@@ -150,6 +149,8 @@ def diff(old, new, display=True):
     line_types = {' ': '%Reset', '-': '%Red', '+': '%Green', '?': '%Pink'}
 
     if display:
+        import difflib  # only needed here, kept off the start-up path
+
         for line in difflib.Differ().compare(old, new):
             if line.startswith('?'):
                 continue
@@ -5,7 +5,7 @@ import os
 import shutil
 import re
 import time
-from typing import Union, List
+from typing import Iterable, Iterator, Union
 
 from colorama import Fore, init
 init(autoreset=True)
@@ -53,28 +53,47 @@ class CenteredBanner:
         ansi_regex = re.compile(r'\033\[[0-9;]*[mK]')
         return ansi_regex.sub('', text)
 
-    def center_text(self, text: Union[str, List[str]], vertical: bool = False) -> str:
+    def center_text(self, text: Union[str, Iterable[str]], vertical: bool = False) -> str:
         """
         Center text or ASCII banner in the console with color support.
         
         Args:
-            text (Union[str, List[str]]): Single-line text or list of lines (ASCII art).
+            text (Union[str, Iterable[str]]): Single-line text or lines (ASCII art).
             vertical (bool): Whether to center vertically as well.
         
         Returns:
             str: Centered text with color ready to display.
         """
+        return "\n".join(self.iter_centered(text, vertical))
+
+    def iter_centered(self, text: Union[str, Iterable[str]], vertical: bool = False) -> Iterator[str]:
+        """
+        Yield the centered lines of text or ASCII banner one at a time.
+
+        Lines are taken lazily from `text`, so a row iterator such as
+        Figlet.iter_lines is centered without holding the whole art. Only
+        vertical centering, which needs the line count, collects the lines first.
+        
+        Args:
+            text (Union[str, Iterable[str]]): Single-line text or lines (ASCII art).
+            vertical (bool): Whether to center vertically as well.
+        
+        Returns:
+            Iterator[str]: Centered lines without line endings.
+        """
         width, height = self.get_console_size()
-        lines = text if isinstance(text, list) else text.splitlines()
-        if not lines:
-            return ""
+        lines = text.splitlines() if isinstance(text, str) else text
 
-        # Find the longest line to determine padding
-        max_width = max(len(self.strip_ansi_codes(line)) for line in lines)
-        if max_width > width:
-            max_width = width  # Truncate if text is wider than console
+        if vertical:
+            lines = list(lines)
+            if lines and len(lines) < height:
+                top_padding = (height - len(lines)) // 2
+                bottom_padding = height - top_padding - len(lines)
+                yield from [self.padding_char * width] * top_padding
+                yield from self.iter_centered(lines)
+                yield from [self.padding_char * width] * bottom_padding
+                return
 
-        centered_lines = []
         for line in lines:
             # Remove ANSI codes for length calculation
             clean_line = self.strip_ansi_codes(line)
@@ -85,38 +104,30 @@ class CenteredBanner:
             # Apply color only to non-padding text
             colored_line = (self.color + line + Fore.RESET) if self.color else line
             centered_line = self.padding_char * padding + colored_line
-            centered_line = centered_line.ljust(width, self.padding_char)
-            centered_lines.append(centered_line)
-
-        # Vertical centering
-        if vertical and len(lines) < height:
-            top_padding = (height - len(lines)) // 2
-            centered_lines = [self.padding_char * width] * top_padding + centered_lines
-            centered_lines += [self.padding_char * width] * (height - len(centered_lines))
-        
-        return "\n".join(centered_lines)
+            yield centered_line.ljust(width, self.padding_char)
 
     def display(self, text, vertical: bool = False, animate: bool = False):
         """
         Display the centered text or ASCII banner in the console with color and animation.
         
         Args:
-            text (Union[str, List[str]]): Text or ASCII art to display.
+            text (Union[str, Iterable[str]]): Text or ASCII art to display.
             vertical (bool): Whether to center vertically.
             animate (bool): Whether to add a simple animation effect.
         """
         if self.clear_screen:
             os.system("cls" if os.name == "nt" else "clear")
 
+        if not animate:
+            for line in self.iter_centered(text, vertical):
+                print(line, flush=True)
+            return
+
         centered_text = self.center_text(text, vertical)
-        
-        if animate:
-            for _ in range(3):  # Simple blink animation
-                print(centered_text, flush=True)
-                time.sleep(0.3)
-                if self.clear_screen:
-                    os.system("cls" if os.name == "nt" else "clear")
-                time.sleep(0.1)
-            print(centered_text, flush=True)  # Final display
-        else:
-            print(centered_text, flush=True)
\ No newline at end of file
+        for _ in range(3):  # Simple blink animation
+            print(centered_text, flush=True)
+            time.sleep(0.3)
+            if self.clear_screen:
+                os.system("cls" if os.name == "nt" else "clear")
+            time.sleep(0.1)
+        print(centered_text, flush=True)  # Final display
\ No newline at end of file